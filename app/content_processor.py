@@ -0,0 +1,369 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from config import config
+
+# Notion 接口的限制：单个文本对象最多 2000 个字符，单个块最多 100 个文本对象，
+# 创建页面时最多附带 100 个子块
+NOTION_TEXT_MAX_CHARS = 2000
+NOTION_RICH_TEXT_MAX_ITEMS = 100
+NOTION_CHILDREN_MAX_BLOCKS = 100
+
+# 与 Article.summary 的截取长度保持一致
+SUMMARY_MAX_CHARS = 1990
+
+_LIST_ITEM_TYPES = {
+    "bullet_list_open": "bulleted_list_item",
+    "ordered_list_open": "numbered_list_item",
+}
+
+
+@dataclass
+class ProcessedContent:
+    """一篇文章正文的处理结果"""
+
+    markdown: str
+    summary: str
+    blocks: List[dict] = field(default_factory=list)
+
+
+class _LRUCache:
+    """按内容哈希缓存处理结果，同一篇文章在多个源或多次运行中出现时不重复转换"""
+
+    def __init__(self, maxsize: Optional[int] = None) -> None:
+        self._maxsize = maxsize
+        self._data: "OrderedDict[Tuple[str, str], object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    @property
+    def maxsize(self) -> int:
+        # 未指定时读取配置 CONTENT_CACHE_SIZE，导入模块时不加载配置
+        return self._maxsize if self._maxsize is not None else config.CONTENT_CACHE_SIZE
+
+    def put(self, key: Tuple[str, str], value):
+        maxsize = self.maxsize
+        if maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_cache = _LRUCache()
+
+_markdown_parser = None
+_parser_lock = threading.Lock()
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _get_markdown_parser():
+    """markdown-it 实例在创建后只读，所有线程共用一个"""
+    global _markdown_parser
+    if _markdown_parser is None:
+        with _parser_lock:
+            if _markdown_parser is None:
+                from markdown_it import MarkdownIt
+
+                _markdown_parser = MarkdownIt("commonmark").enable(
+                    ["table", "strikethrough"]
+                )
+    return _markdown_parser
+
+
+def html_to_markdown(html: str) -> str:
+    """
+    将HTML内容转换为Markdown。
+
+    HTML2Text 在处理完一篇残缺的HTML后会把列表、引用等状态带到下一篇，不能跨文章复用，
+    每次创建新实例（创建开销约几微秒，远小于转换本身）。
+    """
+    import html2text
+
+    converter = html2text.HTML2Text()
+    converter.ignore_links = False
+    converter.bypass_tables = False
+    converter.body_width = 0  # 设置为0表示不自动换行
+    return converter.handle(html or "")
+
+
+def _text_items(content: str, annotations: Dict[str, bool], url: Optional[str]):
+    """生成 Notion 文本对象，超长的内容按 2000 字符拆分"""
+    for i in range(0, len(content), NOTION_TEXT_MAX_CHARS):
+        item = {
+            "type": "text",
+            "text": {
+                "content": content[i : i + NOTION_TEXT_MAX_CHARS],
+                "link": {"url": url} if url else None,
+            },
+        }
+        if any(annotations.values()):
+            item["annotations"] = dict(annotations)
+        yield item
+
+
+def _is_image_url(url: str) -> bool:
+    return url.startswith(("http://", "https://")) and len(url) <= 2000
+
+
+def _image_block(url: str, alt: str) -> dict:
+    block = {"type": "external", "external": {"url": url}}
+    if alt:
+        block["caption"] = list(_text_items(alt, {}, None))[:1]
+    return {"object": "block", "type": "image", "image": block}
+
+
+def _inline_segments(children) -> List[Tuple[str, object]]:
+    """
+    将 inline token 转换为片段列表：("text", rich_text 列表) 或 ("image", 图片块)，
+    相邻且样式相同的文本合并成一个文本对象。
+    """
+    segments: List[Tuple[str, object]] = []
+    rich_text: List[dict] = []
+    annotations = {"bold": False, "italic": False, "strikethrough": False}
+    url = None
+    pending = ""
+    pending_style = None
+
+    def flush_text():
+        nonlocal pending
+        if pending:
+            rich_text.extend(_text_items(pending, pending_style[0], pending_style[1]))
+            pending = ""
+
+    def append_text(content: str, code: bool = False):
+        nonlocal pending, pending_style
+        style = (dict(annotations, code=True) if code else dict(annotations), url)
+        if pending and style != pending_style:
+            flush_text()
+        pending_style = style
+        pending += content
+
+    for token in children or []:
+        kind = token.type
+        if kind == "text":
+            append_text(token.content)
+        elif kind == "code_inline":
+            append_text(token.content, code=True)
+        elif kind == "softbreak":
+            append_text(" ")
+        elif kind == "hardbreak":
+            append_text("\n")
+        elif kind in ("strong_open", "strong_close"):
+            annotations["bold"] = kind == "strong_open"
+        elif kind in ("em_open", "em_close"):
+            annotations["italic"] = kind == "em_open"
+        elif kind in ("s_open", "s_close"):
+            annotations["strikethrough"] = kind == "s_open"
+        elif kind == "link_open":
+            href = token.attrs.get("href") or ""
+            url = href if href.startswith(("http://", "https://")) else None
+        elif kind == "link_close":
+            url = None
+        elif kind == "image":
+            src = token.attrs.get("src") or ""
+            if _is_image_url(src):
+                flush_text()
+                if rich_text:
+                    segments.append(("text", rich_text))
+                    rich_text = []
+                segments.append(("image", _image_block(src, token.content)))
+            elif token.content:
+                append_text(token.content)
+    flush_text()
+    if rich_text:
+        segments.append(("text", rich_text))
+    return segments
+
+
+def _rich_text_block(block_type: str, rich_text: List[dict], **extra) -> dict:
+    body = {"rich_text": rich_text[:NOTION_RICH_TEXT_MAX_ITEMS]}
+    body.update(extra)
+    return {"object": "block", "type": block_type, block_type: body}
+
+
+def _plain_text(rich_text: List[dict]) -> str:
+    return "".join(item["text"]["content"] for item in rich_text)
+
+
+def markdown_to_blocks(markdown: str) -> Tuple[List[dict], str]:
+    """
+    将Markdown转换为 Notion 块，同时提取纯文本（用于摘要），只解析一遍。
+
+    Notion 不支持在创建页面时嵌套太深的子块，嵌套的列表和引用展开为同一层级。
+    """
+    tokens = _get_markdown_parser().parse(markdown or "")
+    blocks: List[dict] = []
+    texts: List[str] = []
+    list_types: List[str] = []
+    quote_depth = 0
+    heading_level = 0
+    in_table = False
+    # 表格的一行：每个单元格的 rich_text，以及单元格中的图片块
+    table_row: List[List[dict]] = []
+    row_images: List[dict] = []
+
+    for token in tokens:
+        kind = token.type
+        if kind in _LIST_ITEM_TYPES:
+            list_types.append(_LIST_ITEM_TYPES[kind])
+        elif kind in ("bullet_list_close", "ordered_list_close"):
+            list_types.pop()
+        elif kind == "blockquote_open":
+            quote_depth += 1
+        elif kind == "blockquote_close":
+            quote_depth -= 1
+        elif kind == "heading_open":
+            heading_level = min(int(token.tag[1:]), 3)
+        elif kind == "heading_close":
+            heading_level = 0
+        elif kind in ("table_open", "table_close"):
+            in_table = kind == "table_open"
+        elif kind == "tr_open":
+            table_row, row_images = [], []
+        elif kind == "tr_close":
+            # Notion 块不支持在创建页面时附带表格，每行展开为一个段落，单元格之间用 | 分隔
+            rich_text: List[dict] = []
+            for i, cell in enumerate(table_row):
+                if i:
+                    rich_text.extend(_text_items(" | ", {}, None))
+                rich_text.extend(cell)
+            row = _plain_text(rich_text)
+            if row.strip(" |"):
+                blocks.append(_rich_text_block("paragraph", rich_text))
+                texts.append(row)
+            blocks.extend(row_images)
+        elif kind in ("fence", "code_block"):
+            code = token.content.rstrip("\n")
+            if code:
+                blocks.append(
+                    _rich_text_block(
+                        "code", list(_text_items(code, {}, None)), language="plain text"
+                    )
+                )
+                texts.append(code)
+        elif kind == "hr":
+            blocks.append({"object": "block", "type": "divider", "divider": {}})
+        elif kind == "inline":
+            if in_table:
+                cell: List[dict] = []
+                for segment_type, value in _inline_segments(token.children):
+                    if segment_type == "image":
+                        row_images.append(value)
+                    else:
+                        cell.extend(value)
+                table_row.append(cell)
+                continue
+            if heading_level:
+                block_type = f"heading_{heading_level}"
+            elif list_types:
+                block_type = list_types[-1]
+            elif quote_depth:
+                block_type = "quote"
+            else:
+                block_type = "paragraph"
+            for segment_type, value in _inline_segments(token.children):
+                if segment_type == "image":
+                    blocks.append(value)
+                else:
+                    blocks.append(_rich_text_block(block_type, value))
+                    texts.append(_plain_text(value))
+    return blocks, "\n".join(texts)
+
+
+def summarize(text: str, max_chars: int = SUMMARY_MAX_CHARS) -> str:
+    """截取纯文本摘要，规则与 Article.summary 一致"""
+    text = text.strip()
+    return text[:max_chars] + "..." if len(text) > max_chars else text
+
+
+def notion_blocks(markdown: str) -> List[dict]:
+    """Markdown 对应的 Notion 块，按内容哈希缓存"""
+    key = ("markdown", _content_hash(markdown or ""))
+    blocks = _cache.get(key)
+    if blocks is None:
+        blocks, _ = markdown_to_blocks(markdown)
+        _cache.put(key, blocks)
+    return blocks
+
+
+def convert_html(html: str) -> ProcessedContent:
+    """不经过缓存地处理一篇HTML正文"""
+    markdown = html_to_markdown(html)
+    blocks, text = markdown_to_blocks(markdown)
+    return ProcessedContent(markdown=markdown, summary=summarize(text), blocks=blocks)
+
+
+def convert_batch(htmls: List[str]) -> List[ProcessedContent]:
+    """在进程池中执行：一次处理一个RSS源的多篇正文，减少进程间往返"""
+    return [convert_html(html) for html in htmls]
+
+
+def _cache_processed(key: Tuple[str, str], processed: ProcessedContent):
+    _cache.put(key, processed)
+    # 写入Notion时按Markdown取块，提前放进缓存
+    _cache.put(("markdown", _content_hash(processed.markdown)), processed.blocks)
+
+
+def process_many(htmls: List[str]) -> List[ProcessedContent]:
+    """
+    批量处理多篇正文：转换为Markdown、Notion 块和纯文本摘要，结果按内容哈希缓存。
+    命中缓存的直接返回，其余的作为一个任务交给进程池转换。
+
+    返回的对象在缓存中共享，调用方不要修改。
+    """
+    keys = [("html", _content_hash(html or "")) for html in htmls]
+    results: List[Optional[ProcessedContent]] = [_cache.get(key) for key in keys]
+    missing = [i for i, processed in enumerate(results) if processed is None]
+    if missing:
+        from app import cpu_pool
+
+        converted = cpu_pool.run(convert_batch, [htmls[i] for i in missing])
+        for i, processed in zip(missing, converted):
+            _cache_processed(keys[i], processed)
+            results[i] = processed
+    return results
+
+
+def page_children(
+    markdown: str, link: Optional[str] = None, max_blocks: Optional[int] = None
+) -> List[dict]:
+    """
+    创建页面时附带的子块：超过上限时截断，并在末尾加上原文链接，
+    保证每篇文章只需要一次创建页面的调用。
+    """
+    if max_blocks is None:
+        max_blocks = config.NOTION_PAGE_MAX_BLOCKS
+    max_blocks = min(max_blocks, NOTION_CHILDREN_MAX_BLOCKS)
+    if max_blocks <= 0:
+        return []
+    blocks = notion_blocks(markdown)
+    if len(blocks) <= max_blocks:
+        return list(blocks)
+    if not link:
+        return list(blocks[:max_blocks])
+    children = list(blocks[: max_blocks - 1])
+    children.append(
+        _rich_text_block(
+            "paragraph", list(_text_items("阅读原文", {"bold": True}, link))
+        )
+    )
+    return children
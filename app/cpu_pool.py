@@ -0,0 +1,297 @@
+import concurrent.futures
+import itertools
+import os
+import signal
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, TypeVar
+
+from app.log import logger
+from config import config
+
+T = TypeVar("T")
+
+# 超时由工作进程自己中断；开始执行后超过这个余量仍没有结果时，认为工作进程卡死（如停在 C 扩展中）
+_TIMEOUT_GRACE = 5.0
+
+# 终止卡死的工作进程用的信号，Windows 上没有 SIGKILL
+_KILL_SIGNAL = getattr(signal, "SIGKILL", signal.SIGTERM)
+
+# 工作进程内：任务开始执行时通知父进程的队列，由进程池的 initializer 设置
+_started_queue = None
+
+
+class TaskTimeoutError(Exception):
+    """进程池中的任务超过了硬性超时"""
+
+
+def _init_worker(started_queue):
+    global _started_queue
+    _started_queue = started_queue
+
+
+def _call_with_timeout(task_id: int, fn: Callable[..., T], timeout: float, *args) -> T:
+    """
+    在工作进程中执行 fn(*args)：先告诉父进程任务开始执行和所在进程，
+    超过 timeout 秒时用 SIGALRM 在任务内部抛出 TaskTimeoutError，工作进程本身继续可用。
+    不支持 setitimer 的平台只依赖父进程的超时。
+    """
+    if _started_queue is not None:
+        _started_queue.put((task_id, os.getpid()))
+    if not hasattr(signal, "setitimer"):
+        return fn(*args)
+
+    def on_alarm(signum, frame):
+        raise TaskTimeoutError(f"{fn.__name__} 超过 {timeout}s 未完成")
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+class _Task:
+    """父进程中一个已提交任务的状态，started 在任务开始执行或结束时置位"""
+
+    def __init__(self) -> None:
+        self.started = threading.Event()
+        self.started_at = 0.0
+        self.pid: Optional[int] = None
+
+
+class _Generation:
+    """
+    一个 ProcessPoolExecutor 和它的任务记录。
+
+    被替换后不再接收任务；其中卡死的工作进程在其他执行中的任务结束后终止，
+    避免退出时 concurrent.futures 一直等待它。
+    """
+
+    def __init__(self, workers: int, max_tasks_per_child: int) -> None:
+        import multiprocessing
+
+        # max_tasks_per_child 不支持 fork 方式启动；spawn 的子进程也不会继承父进程的线程和锁
+        context = multiprocessing.get_context("spawn")
+        self._started_queue = context.SimpleQueue()
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            max_tasks_per_child=max_tasks_per_child,
+            initializer=_init_worker,
+            initargs=(self._started_queue,),
+        )
+        self._lock = threading.Lock()
+        self._tasks: Dict[int, _Task] = {}
+        self._stuck: Dict[int, int] = {}
+        self._retired = False
+        self._closed = False
+        threading.Thread(
+            target=self._listen, name="cpu-pool-started", daemon=True
+        ).start()
+
+    def _listen(self):
+        while True:
+            message = self._started_queue.get()
+            if message is None:
+                return
+            task_id, pid = message
+            with self._lock:
+                task = self._tasks.get(task_id)
+                if task is not None:
+                    task.pid, task.started_at = pid, time.monotonic()
+            if task is not None:
+                task.started.set()
+
+    def add(self, task_id: int) -> _Task:
+        # 先登记再提交，工作进程的开始通知不会早于登记
+        task = _Task()
+        with self._lock:
+            self._tasks[task_id] = task
+        return task
+
+    def finish(self, task_id: int):
+        with self._lock:
+            task = self._tasks.pop(task_id, None)
+        if task is not None:
+            task.started.set()
+        self._reap_if_idle()
+
+    def retire(self, stuck_task_id: Optional[int] = None):
+        """不再使用这个进程池：排队中的任务被取消，执行中的任务照常完成"""
+        with self._lock:
+            self._retired = True
+            task = self._tasks.get(stuck_task_id)
+            if task is not None and task.pid is not None:
+                self._stuck[stuck_task_id] = task.pid
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self._reap_if_idle()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _stuck_pids(self) -> List[int]:
+        # 已经结束的任务所在的进程可能已退出、进程号被复用，只终止仍未结束的
+        return [pid for task_id, pid in self._stuck.items() if task_id in self._tasks]
+
+    def _reap_if_idle(self):
+        """
+        被替换后除卡死的任务外没有其他执行中的任务时，终止卡死的工作进程。
+
+        还没开始执行的任务不等待（可能正排在卡死的进程后面），
+        进程池因此不可用后它们由 run 重新提交。
+        """
+        with self._lock:
+            if not self._retired or self._closed:
+                return
+            for task_id, task in self._tasks.items():
+                if task_id not in self._stuck and task.pid is not None:
+                    return
+            self._closed = True
+            pids = self._stuck_pids()
+        self._close(pids)
+
+    def close(self):
+        """立即终止卡死的工作进程并等待进程池退出"""
+        with self._lock:
+            closed, self._closed = self._closed, True
+            pids = self._stuck_pids()
+        if not closed:
+            self._close(pids)
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def _close(self, pids: List[int]):
+        for pid in pids:
+            try:
+                os.kill(pid, _KILL_SIGNAL)
+                logger.warning(f"终止卡死的工作进程 {pid}")
+            except ProcessLookupError:
+                pass
+        self._started_queue.put(None)
+
+
+class CpuPool:
+    """
+    CPU 密集任务（feedparser 解析、HTML 转换）使用的进程池，绕开 GIL 用满多个核。
+
+    - 任务函数和参数、返回值都需要可以 pickle，参数传原始内容，返回精简后的结果
+    - 每个任务有硬性超时，从开始执行时计算（排队等待不计入），由工作进程在任务内部中断
+    - 工作进程仍无响应时只替换这一个进程池：排队中被取消的任务重新提交，执行中的任务继续完成，
+      卡死的工作进程在这些任务结束后被终止，不会拖住整次运行或进程退出
+    - 工作进程执行 max_tasks_per_child 个任务后自动替换，释放解析大文档时累积的内存
+    - workers 为 0 时在当前线程中直接执行
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_tasks_per_child: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self._workers = workers
+        self._max_tasks_per_child = max_tasks_per_child
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._generation: Optional[_Generation] = None
+        self._retired: List[_Generation] = []
+        self._task_ids = itertools.count()
+
+    @property
+    def workers(self) -> int:
+        return self._workers if self._workers is not None else config.CPU_WORKERS
+
+    @property
+    def timeout(self) -> float:
+        return self._timeout if self._timeout is not None else config.CPU_TASK_TIMEOUT
+
+    def _get_generation(self) -> _Generation:
+        with self._lock:
+            if self._generation is None:
+                self._generation = _Generation(
+                    self.workers,
+                    self._max_tasks_per_child or config.CPU_MAX_TASKS_PER_CHILD,
+                )
+            return self._generation
+
+    def _recycle(self, generation: _Generation, stuck_task_id: Optional[int] = None):
+        """不再使用 generation，下次提交任务时创建新的进程池"""
+        with self._lock:
+            if self._generation is generation:
+                self._generation = None
+            self._retired = [old for old in self._retired if not old.closed]
+            if not generation.closed and generation not in self._retired:
+                self._retired.append(generation)
+        generation.retire(stuck_task_id)
+
+    def run(self, fn: Callable[..., T], *args, timeout: Optional[float] = None) -> T:
+        """在进程池中执行 fn(*args) 并等待结果，超时抛出 TaskTimeoutError"""
+        if self.workers <= 0:
+            return fn(*args)
+        timeout = timeout if timeout is not None else self.timeout
+
+        for attempt in range(2):
+            generation = self._get_generation()
+            task_id = next(self._task_ids)
+            task = generation.add(task_id)
+            try:
+                future = generation.executor.submit(
+                    _call_with_timeout, task_id, fn, timeout, *args
+                )
+            except RuntimeError as e:
+                # 进程池已被其他线程替换（工作进程卡死或异常退出），在新的进程池中重试
+                generation.finish(task_id)
+                self._recycle(generation)
+                if attempt:
+                    raise
+                logger.warning(f"进程池不可用，重建后重试 {fn.__name__}: {e!r}")
+                continue
+            future.add_done_callback(
+                lambda _, task_id=task_id: generation.finish(task_id)
+            )
+            # 排队等待的时间不计入超时
+            task.started.wait()
+            try:
+                if future.done():
+                    return future.result()
+                deadline = task.started_at + timeout + _TIMEOUT_GRACE
+                return future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except concurrent.futures.CancelledError:
+                # 排队中的任务随被替换的进程池一起取消
+                if attempt:
+                    raise
+                logger.warning(f"进程池已替换，重新提交 {fn.__name__}")
+            except concurrent.futures.TimeoutError:
+                if future.done():
+                    # 任务函数自己抛出的超时异常
+                    raise
+                logger.error(f"任务 {fn.__name__} 超过 {timeout}s 仍无响应，替换进程池")
+                self._recycle(generation, task_id)
+                raise TaskTimeoutError(f"{fn.__name__} 超过 {timeout}s 未完成")
+            except BrokenProcessPool as e:
+                # 工作进程异常退出，整个进程池不可用
+                self._recycle(generation)
+                if attempt:
+                    raise
+                logger.warning(f"进程池不可用，重建后重试 {fn.__name__}: {e!r}")
+
+    def shutdown(self):
+        """关闭进程池，连同之前被替换、仍有卡死工作进程的旧进程池"""
+        with self._lock:
+            generation, self._generation = self._generation, None
+            retired, self._retired = self._retired, []
+        for old in retired:
+            old.close()
+        if generation is not None:
+            generation.close()
+
+
+# 进程内共用的进程池，第一次提交任务时才启动工作进程
+pool = CpuPool()
+
+
+def run(fn: Callable[..., T], *args, timeout: Optional[float] = None) -> T:
+    return pool.run(fn, *args, timeout=timeout)
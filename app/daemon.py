@@ -0,0 +1,153 @@
+import json
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+from app import cpu_pool, fetch_engine, http_client, metrics, notifier, pipeline
+from app.log import logger
+from app.model.rss_item import RSSItem
+from app.notion_manager import get_active_rss_feeds
+from config import config
+
+
+class Daemon:
+    """
+    常驻进程：按固定间隔执行抓取，Notion客户端、HTTP连接池和本地缓存在各轮之间保持，
+    RSS源列表定期重新加载。收到 SIGTERM/SIGINT 后等待当前一轮结束再退出。
+    """
+
+    def __init__(self, force_all: bool = False) -> None:
+        self.force_all = force_all
+        self.cycle_interval = config.DAEMON_CYCLE_INTERVAL
+        self.feed_reload_interval = config.DAEMON_FEED_RELOAD_INTERVAL
+        self._stop = threading.Event()
+        self._engine = (
+            fetch_engine.AsyncEngine() if config.FETCH_ENGINE != "thread" else None
+        )
+        self._feeds: List[RSSItem] = []
+        self._feeds_loaded_at = 0.0
+        self._health_server: Optional[ThreadingHTTPServer] = None
+        self._status = {
+            "started_at": time.time(),
+            "cycles": 0,
+            "running": False,
+            "feeds": 0,
+            "last_cycle_started_at": None,
+            "last_cycle_finished_at": None,
+            "last_cycle_seconds": None,
+            "last_error": None,
+            "last_report": None,
+        }
+        self._status_lock = threading.Lock()
+
+    def status(self) -> dict:
+        with self._status_lock:
+            status = dict(self._status)
+        status["notifications"] = notifier.dispatcher.last_reports()
+        return status
+
+    def _update_status(self, **kwargs):
+        with self._status_lock:
+            self._status.update(kwargs)
+
+    def stop(self, *_):
+        logger.info("收到退出信号，当前一轮结束后退出")
+        self._stop.set()
+
+    def _load_feeds(self) -> List[RSSItem]:
+        if (
+            not self._feeds
+            or time.time() - self._feeds_loaded_at >= self.feed_reload_interval
+        ):
+            self._feeds = get_active_rss_feeds()
+            self._feeds_loaded_at = time.time()
+            logger.info(f"重新加载RSS源列表，共 {len(self._feeds)} 个")
+        return self._feeds
+
+    def _run_feeds(self, rss_feeds):
+        if self._engine is not None:
+            self._engine.run(rss_feeds)
+        else:
+            fetch_engine.run_with_threads(rss_feeds)
+
+    def run_cycle(self):
+        started = time.time()
+        self._update_status(running=True, last_cycle_started_at=started)
+        try:
+            feeds = self._load_feeds()
+            self._update_status(feeds=len(feeds))
+            report = pipeline.run_once(
+                force_all=self.force_all, rss_feeds=feeds, run_feeds=self._run_feeds
+            )
+            self._update_status(last_report=report, last_error=None)
+        except Exception as e:
+            logger.error(f"本轮抓取失败: {e}")
+            self._update_status(last_error=str(e))
+        finally:
+            finished = time.time()
+            with self._status_lock:
+                self._status["cycles"] += 1
+                self._status["running"] = False
+                self._status["last_cycle_finished_at"] = finished
+                self._status["last_cycle_seconds"] = round(finished - started, 3)
+
+    def _start_health_server(self):
+        daemon = self
+
+        class HealthHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = metrics.registry.prometheus_text().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif self.path in ("/health", "/healthz", "/status"):
+                    body = json.dumps(daemon.status(), ensure_ascii=False).encode(
+                        "utf-8"
+                    )
+                    content_type = "application/json; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(f"health: {format % args}")
+
+        self._health_server = ThreadingHTTPServer(
+            (config.DAEMON_HEALTH_HOST, config.DAEMON_HEALTH_PORT), HealthHandler
+        )
+        threading.Thread(
+            target=self._health_server.serve_forever, name="health", daemon=True
+        ).start()
+        logger.info(
+            f"健康检查服务已启动: http://{config.DAEMON_HEALTH_HOST}:{config.DAEMON_HEALTH_PORT}/healthz"
+        )
+
+    def serve(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        if config.DAEMON_HEALTH_PORT:
+            self._start_health_server()
+
+        logger.info(f"常驻模式启动，每 {self.cycle_interval} 秒执行一轮抓取")
+        try:
+            while not self._stop.is_set():
+                self.run_cycle()
+                self._stop.wait(self.cycle_interval)
+        finally:
+            self.close()
+
+    def close(self):
+        if self._health_server is not None:
+            self._health_server.shutdown()
+        if self._engine is not None:
+            self._engine.close()
+        notifier.dispatcher.wait(timeout=config.NOTIFY_TIMEOUT)
+        http_client.close_session()
+        cpu_pool.pool.shutdown()
+        logger.info("常驻进程已退出")
@@ -0,0 +1,112 @@
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+import pytz
+
+from app.log import logger
+
+# 目标时区：东八区（北京时间）
+TARGET_TIMEZONE = pytz.timezone("Asia/Shanghai")
+
+_MONTHS = {
+    "jan": 1,
+    "feb": 2,
+    "mar": 3,
+    "apr": 4,
+    "may": 5,
+    "jun": 6,
+    "jul": 7,
+    "aug": 8,
+    "sep": 9,
+    "oct": 10,
+    "nov": 11,
+    "dec": 12,
+}
+
+# RFC 822 / RFC 2822，例如 "Mon, 07 Oct 2024 10:00:00 GMT"
+_RFC822_RE = re.compile(
+    r"^\s*(?:[A-Za-z]{3},?\s+)?(\d{1,2})\s+([A-Za-z]{3})\s+(\d{4})\s+"
+    r"(\d{1,2}):(\d{2})(?::(\d{2}))?\s*(GMT|UTC|UT|Z|[+-]\d{4})?\s*$"
+)
+
+# ISO 8601，例如 "2024-10-07T10:00:00Z"、"2024-10-07T10:00:00.123+08:00"
+_ISO8601_RE = re.compile(r"^\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?")
+
+
+def _parse_rfc822(date_str: str) -> Optional[datetime]:
+    match = _RFC822_RE.match(date_str)
+    if not match:
+        return None
+    day, month, year, hour, minute, second, zone = match.groups()
+    month_num = _MONTHS.get(month.lower())
+    if month_num is None:
+        return None
+
+    if zone is None or zone in ("GMT", "UTC", "UT", "Z"):
+        tzinfo = timezone.utc
+    else:
+        offset = int(zone[1:3]) * 60 + int(zone[3:5])
+        tzinfo = timezone(timedelta(minutes=-offset if zone[0] == "-" else offset))
+
+    try:
+        return datetime(
+            int(year),
+            month_num,
+            int(day),
+            int(hour),
+            int(minute),
+            int(second or 0),
+            tzinfo=tzinfo,
+        )
+    except (ValueError, OverflowError):
+        # 日期或时间超出范围（如 2 月 31 日、25 点），交给 dateutil 再试
+        return None
+
+
+def _parse_iso8601(date_str: str) -> Optional[datetime]:
+    if not _ISO8601_RE.match(date_str):
+        return None
+    try:
+        return datetime.fromisoformat(date_str.strip())
+    except ValueError:
+        return None
+
+
+def _normalize(parsed_date: datetime, strip_seconds: bool) -> str:
+    # 如果 parsed_date 没有时区信息，假设为 UTC 时间
+    if parsed_date.tzinfo is None:
+        parsed_date = parsed_date.replace(tzinfo=timezone.utc)
+
+    # 去除秒数（如果指定）
+    if strip_seconds:
+        parsed_date = parsed_date.replace(second=0, microsecond=0)
+
+    return parsed_date.astimezone(TARGET_TIMEZONE).isoformat(timespec="seconds")
+
+
+@lru_cache(maxsize=4096)
+def _parse_cached(date_str: str, strip_seconds: bool) -> Optional[str]:
+    parsed_date = _parse_rfc822(date_str) or _parse_iso8601(date_str)
+    if parsed_date is None:
+        # 其他格式交给 dateutil 处理
+        from dateutil import parser
+
+        try:
+            parsed_date = parser.parse(date_str)
+        except (ValueError, OverflowError) as e:
+            logger.error(f"日期格式转换错误，输入值 '{date_str}': {e}")
+            return None
+    return _normalize(parsed_date, strip_seconds)
+
+
+def parse_date(date_str, strip_seconds=True):
+    """尝试解析不同格式的日期字符串，转换为ISO 8601格式，并转换为东八区（北京时间）"""
+
+    if date_str is None:
+        now = datetime.now(TARGET_TIMEZONE).isoformat()
+        logger.warning(f"日期字段为空，将使用当前日期. 当前日期{now}")
+        return now
+
+    return _parse_cached(date_str, strip_seconds)
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from app.local_store import get_connection, get_lock, register_schema
+
+
+@dataclass
+class FeedValidator:
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    last_status: Optional[int] = None
+
+
+register_schema(
+    """
+    CREATE TABLE IF NOT EXISTS feed_validators (
+        url TEXT PRIMARY KEY,
+        etag TEXT,
+        last_modified TEXT,
+        last_status INTEGER,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+)
+
+
+def get_validator(url: str) -> Optional[FeedValidator]:
+    """读取RSS源上次请求记录的 ETag / Last-Modified"""
+    with get_lock():
+        row = (
+            get_connection()
+            .execute(
+                "SELECT url, etag, last_modified, last_status FROM feed_validators WHERE url = ?",
+                (url,),
+            )
+            .fetchone()
+        )
+    return FeedValidator(*row) if row else None
+
+
+def get_conditional_headers(url: str) -> Dict[str, str]:
+    """根据缓存的校验信息构造条件请求头"""
+    validator = get_validator(url)
+    headers = {}
+    if validator is None:
+        return headers
+    if validator.etag:
+        headers["If-None-Match"] = validator.etag
+    if validator.last_modified:
+        headers["If-Modified-Since"] = validator.last_modified
+    return headers
+
+
+def save_validator(url: str, status: int, headers) -> None:
+    """保存响应中的 ETag / Last-Modified，304 时保留原有的校验值"""
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    with get_lock():
+        get_connection().execute(
+            """
+            INSERT INTO feed_validators (url, etag, last_modified, last_status, updated_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(url) DO UPDATE SET
+                etag = COALESCE(excluded.etag, CASE WHEN excluded.last_status = 304 THEN etag END),
+                last_modified = COALESCE(excluded.last_modified, CASE WHEN excluded.last_status = 304 THEN last_modified END),
+                last_status = excluded.last_status,
+                updated_at = CURRENT_TIMESTAMP
+            """,
+            (url, etag, last_modified, status),
+        )
+
+
+def clear_validator(url: str) -> None:
+    """删除RSS源的校验信息，下次抓取时会重新下载完整内容"""
+    with get_lock():
+        get_connection().execute("DELETE FROM feed_validators WHERE url = ?", (url,))
@@ -0,0 +1,298 @@
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+from app import cpu_pool
+from app.log import logger
+from config import config
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+RSS1_NS = "http://purl.org/rss/1.0/"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+DCTERMS_NS = "http://purl.org/dc/terms/"
+XHTML_NS = "http://www.w3.org/1999/xhtml"
+
+# 标题、链接等通用字段只接受这些命名空间下的元素，避免误取 media:title 等扩展字段
+_CORE_NS = ("", ATOM_NS, RSS1_NS)
+
+
+@dataclass
+class FeedEntry:
+    title: str
+    link: str
+    published: Optional[str] = None
+    content: Optional[str] = None
+
+
+@dataclass
+class ParsedFeed:
+    updated: Optional[str] = None
+    entries: List[FeedEntry] = field(default_factory=list)
+    backend: str = "fast"
+
+
+class FeedParseError(Exception):
+    """快速解析器无法处理的输入，需要回退到 feedparser"""
+
+
+def _split_tag(tag: str):
+    if tag.startswith("{"):
+        ns, _, local = tag[1:].partition("}")
+        return ns, local
+    return "", tag
+
+
+def _element_content(elem) -> str:
+    """
+    取元素内容。Atom 的 xhtml 内容保留子元素的标记，与 feedparser 一样去掉外层的 div
+    和 XHTML 命名空间，否则序列化出 <html:p> 这样的标签，转换Markdown时被当作普通文本。
+    """
+    if not len(elem):
+        return elem.text or ""
+    children = list(elem)
+    if (
+        len(children) == 1
+        and _split_tag(children[0].tag) == (XHTML_NS, "div")
+        and not (elem.text or "").strip()
+    ):
+        elem = children[0]
+    for node in elem.iter():
+        ns, local = _split_tag(node.tag)
+        if ns == XHTML_NS:
+            node.tag = local
+    return (elem.text or "") + "".join(
+        ET.tostring(child, encoding="unicode") for child in elem
+    )
+
+
+class FastFeedParser:
+    """
+    增量式RSS/Atom解析器：只提取用到的字段，取满 max_entries 个条目后停止。
+
+    通过 feed() 分块输入内容，返回 True 表示已经取到足够的条目，可以不再输入。
+    """
+
+    def __init__(self, max_entries: int = 20) -> None:
+        self.max_entries = max_entries
+        self.done = False
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root_checked = False
+        self._entry = None
+        self._entry_elem = None
+        self._feed_updated = None
+        self._feed_published = None
+        self.entries: List[FeedEntry] = []
+
+    def feed(self, data: Union[str, bytes]) -> bool:
+        if self.done:
+            return True
+        # XMLPullParser 的语法错误可能在 feed() 时抛出，也可能留到 read_events() 时才抛出
+        try:
+            self._parser.feed(data)
+            self._process_events()
+        except ET.ParseError as e:
+            raise FeedParseError(str(e)) from e
+        return self.done
+
+    def close(self) -> ParsedFeed:
+        if not self.done:
+            try:
+                self._parser.close()
+                self._process_events()
+            except ET.ParseError as e:
+                raise FeedParseError(str(e)) from e
+        if not self._root_checked:
+            raise FeedParseError("空文档")
+        return ParsedFeed(
+            updated=self._feed_updated or self._feed_published,
+            entries=self.entries,
+            backend="fast",
+        )
+
+    def _process_events(self):
+        for event, elem in self._parser.read_events():
+            ns, tag = _split_tag(elem.tag)
+
+            if event == "start":
+                if not self._root_checked:
+                    if tag not in ("rss", "feed", "RDF"):
+                        raise FeedParseError(f"未知的根元素: {elem.tag}")
+                    self._root_checked = True
+                elif self._entry is None and tag in ("item", "entry"):
+                    self._entry = {}
+                    self._entry_elem = elem
+                continue
+
+            if self._entry is None:
+                self._handle_feed_field(ns, tag, elem)
+            elif elem is self._entry_elem:
+                self._finish_entry()
+                elem.clear()
+                if len(self.entries) >= self.max_entries:
+                    self.done = True
+                    return
+            else:
+                self._handle_entry_field(ns, tag, elem)
+
+    def _handle_feed_field(self, ns, tag, elem):
+        if self._feed_updated is None and (
+            (tag == "lastBuildDate" and ns == "")
+            or (tag == "updated" and ns == ATOM_NS)
+            or (tag == "date" and ns == DC_NS)
+        ):
+            self._feed_updated = (elem.text or "").strip() or None
+        elif self._feed_published is None and (
+            (tag == "pubDate" and ns == "") or (tag == "published" and ns == ATOM_NS)
+        ):
+            self._feed_published = (elem.text or "").strip() or None
+
+    def _handle_entry_field(self, ns, tag, elem):
+        entry = self._entry
+        if tag == "title" and ns in _CORE_NS:
+            entry.setdefault("title", (elem.text or "").strip())
+        elif tag == "link" and ns in _CORE_NS:
+            href = elem.get("href")
+            if href is None:
+                # RSS：<link>url</link>
+                if elem.text and elem.text.strip():
+                    entry["link"] = elem.text.strip()
+            elif elem.get("rel", "alternate") == "alternate":
+                entry.setdefault("link", href)
+            else:
+                entry.setdefault("other_link", href)
+        elif tag == "guid" and ns == "":
+            if elem.get("isPermaLink", "true") == "true" and elem.text:
+                entry.setdefault("guid_link", elem.text.strip())
+        elif (tag == "pubDate" and ns == "") or (
+            tag in ("published", "issued") and ns in (ATOM_NS, DCTERMS_NS)
+        ):
+            entry.setdefault("published", (elem.text or "").strip() or None)
+        elif (tag == "encoded" and ns == CONTENT_NS) or (
+            tag == "content" and ns == ATOM_NS
+        ):
+            entry.setdefault("content", _element_content(elem))
+        elif (tag == "description" and ns in _CORE_NS) or (
+            tag == "summary" and ns == ATOM_NS
+        ):
+            entry.setdefault("summary", _element_content(elem))
+
+    def _finish_entry(self):
+        entry = self._entry
+        self._entry = None
+        self._entry_elem = None
+
+        link = entry.get("link") or entry.get("guid_link") or entry.get("other_link")
+        if not link:
+            logger.debug(f"条目缺少链接，跳过: {entry.get('title')}")
+            return
+        self.entries.append(
+            FeedEntry(
+                title=entry.get("title") or link,
+                link=link,
+                published=entry.get("published"),
+                content=entry.get("content") or entry.get("summary") or "",
+            )
+        )
+
+
+def _get_entry_content(entry) -> str:
+    """根据RSS条目的不同情况尝试获取内容"""
+    if "content" in entry and entry["content"]:
+        return entry["content"][0].get("value")
+    if "summary" in entry:
+        return entry["summary"]
+    return entry.get("description") or ""
+
+
+def parse_with_feedparser(content: Union[str, bytes], max_entries: int) -> ParsedFeed:
+    """使用 feedparser 完整解析，格式不规范的RSS也能处理"""
+    import feedparser
+
+    feed = feedparser.parse(content)
+
+    # 遇到未定义的实体等不规范内容时 feedparser 会改用宽松模式并设置 bozo，
+    # 这时只要解析出了条目就照常使用，宽松模式也解析不出内容才算失败
+    if feed.bozo:
+        if not feed.entries:
+            raise Exception(f"RSS解析错误: {feed.bozo_exception}")
+        logger.debug(f"RSS内容不规范，已用宽松模式解析: {feed.bozo_exception}")
+
+    # 记录RSS中的更新时间，优先使用`updated`，如果没有则使用`published`
+    updated = feed.feed.get("updated", None) or feed.feed.get("published", None)
+
+    entries = [
+        FeedEntry(
+            title=entry.get("title") or entry.link,
+            link=entry.link,
+            published=entry.get("published"),
+            content=_get_entry_content(entry),
+        )
+        for entry in feed.entries[:max_entries]
+        if entry.get("link")
+    ]
+    return ParsedFeed(updated=updated, entries=entries, backend="feedparser")
+
+
+class StreamingFeedParser:
+    """
+    边下载边解析：分块输入内容，取满条目后 feed() 返回 True，调用方可以停止下载。
+
+    快速解析器失败时保留已收到的内容，close() 时整体交给 feedparser 解析。
+    """
+
+    def __init__(self, max_entries: int = 20) -> None:
+        self.max_entries = max_entries
+        self._fast = (
+            FastFeedParser(max_entries=max_entries)
+            if config.FEED_PARSER == "fast"
+            else None
+        )
+        self._chunks = []
+        # feed() 和 close() 累计的解析耗时（秒）
+        self.seconds = 0.0
+
+    def feed(self, chunk: Union[str, bytes]) -> bool:
+        started = time.perf_counter()
+        try:
+            return self._feed(chunk)
+        finally:
+            self.seconds += time.perf_counter() - started
+
+    def _feed(self, chunk: Union[str, bytes]) -> bool:
+        # 快速解析器随时可能失败，在它完成之前保留已收到的内容，供 feedparser 回退使用
+        self._chunks.append(chunk)
+        if self._fast is None:
+            return False
+        try:
+            done = self._fast.feed(chunk)
+        except FeedParseError as e:
+            logger.debug(f"快速解析失败，回退到 feedparser: {e}")
+            self._fast = None
+            return False
+        if done:
+            # 已取满条目，不会再回退，释放缓存的内容
+            self._chunks = []
+        return done
+
+    def close(self) -> ParsedFeed:
+        started = time.perf_counter()
+        try:
+            return self._close()
+        finally:
+            self.seconds += time.perf_counter() - started
+
+    def _close(self) -> ParsedFeed:
+        if self._fast is not None:
+            try:
+                feed = self._fast.close()
+                self._chunks = []
+                return feed
+            except FeedParseError as e:
+                logger.debug(f"快速解析失败，回退到 feedparser: {e}")
+
+        content = self._chunks[0][:0].join(self._chunks) if self._chunks else b""
+        self._chunks = []
+        # feedparser 是纯 Python 实现，放到进程池中执行
+        return cpu_pool.run(parse_with_feedparser, content, self.max_entries)
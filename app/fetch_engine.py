@@ -0,0 +1,105 @@
+import asyncio
+import concurrent.futures
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from app import http_client
+from app.log import logger
+from app.model.rss_item import RSSItem
+from app.rss_fetcher import process_rss_feed, process_rss_feed_async
+from config import config
+
+if TYPE_CHECKING:
+    import aiohttp
+
+
+def run_with_threads(rss_feeds: Iterable[RSSItem]):
+    """使用线程池处理RSS源（旧的执行方式）"""
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=config.FETCH_WORKERS
+    ) as executor:
+        future_to_rss = {
+            executor.submit(process_rss_feed, rss_feed): rss_feed
+            for rss_feed in rss_feeds
+        }
+
+        for future in concurrent.futures.as_completed(future_to_rss):
+            rss_feed = future_to_rss[future]
+            try:
+                future.result()
+                logger.info(f"处理完成: {rss_feed.title}")
+            except Exception as exc:
+                logger.error(f"处理 {rss_feed.title} 时发生错误: {exc}")
+
+
+async def _process_with_limit(
+    semaphore: asyncio.Semaphore, session: "aiohttp.ClientSession", rss_feed: RSSItem
+):
+    async with semaphore:
+        try:
+            await process_rss_feed_async(session, rss_feed)
+            logger.info(f"处理完成: {rss_feed.title}")
+        except Exception as exc:
+            logger.error(f"处理 {rss_feed.title} 时发生错误: {exc}")
+
+
+async def _run_in_session(
+    rss_feeds: Iterable[RSSItem], session: "aiohttp.ClientSession"
+):
+    semaphore = asyncio.Semaphore(config.FETCH_CONCURRENCY)
+    iterator = iter(rss_feeds)
+    tasks = []
+    while True:
+        rss_feed = await asyncio.to_thread(next, iterator, None)
+        if rss_feed is None:
+            break
+        tasks.append(
+            asyncio.create_task(_process_with_limit(semaphore, session, rss_feed))
+        )
+    logger.info(f"共 {len(tasks)} 个待抓取的RSS源")
+    await asyncio.gather(*tasks)
+
+
+async def run_with_asyncio(
+    rss_feeds: Iterable[RSSItem], session: Optional["aiohttp.ClientSession"] = None
+):
+    """
+    在单个事件循环中并发下载RSS源，由信号量限制同时进行的数量。
+
+    rss_feeds 可以是分页查询的生成器：在线程中逐个取出RSS源，
+    取到即开始处理，不必等待后续页面。传入 session 时复用该会话。
+    """
+    if session is not None:
+        await _run_in_session(rss_feeds, session)
+        return
+    async with http_client.create_async_session() as session:
+        await _run_in_session(rss_feeds, session)
+
+
+class AsyncEngine:
+    """常驻进程使用：事件循环和HTTP会话在多次运行之间保持，连接池不必重新建立"""
+
+    def __init__(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._session: Optional["aiohttp.ClientSession"] = None
+
+    async def _create_session(self):
+        return http_client.create_async_session()
+
+    def run(self, rss_feeds: Iterable[RSSItem]):
+        if self._session is None or self._session.closed:
+            self._session = self._loop.run_until_complete(self._create_session())
+        self._loop.run_until_complete(run_with_asyncio(rss_feeds, self._session))
+
+    def close(self):
+        if self._session is not None:
+            self._loop.run_until_complete(self._session.close())
+        self._loop.run_until_complete(self._loop.shutdown_default_executor())
+        self._loop.close()
+
+
+def run(rss_feeds: Iterable[RSSItem]):
+    """根据配置选择执行引擎处理RSS源"""
+    if config.FETCH_ENGINE == "thread":
+        run_with_threads(rss_feeds)
+    else:
+        asyncio.run(run_with_asyncio(rss_feeds))
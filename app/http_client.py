@@ -0,0 +1,189 @@
+import importlib.util
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING, AsyncIterator, Iterator, Optional
+
+from config import config
+
+if TYPE_CHECKING:
+    import asyncio
+
+    import aiohttp
+    import requests
+
+# 安装了 brotli 时才声明支持 br，这里只检查是否存在，不在导入时加载
+if importlib.util.find_spec("brotli") is not None:
+    ACCEPT_ENCODING = "gzip, deflate, br"
+else:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+
+CHUNK_SIZE = 64 * 1024
+
+_session = None
+_session_lock = threading.Lock()
+
+# 异步会话 -> {host: asyncio.Semaphore}，会话关闭回收后自动清除
+_host_limits: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_session() -> "requests.Session":
+    """获取进程内共享的 requests.Session，按host复用连接"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=config.HTTP_POOL_HOSTS,
+                    pool_maxsize=config.FETCH_WORKERS,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                _session = session
+    return _session
+
+
+def request(method: str, url: str, **kwargs) -> "requests.Response":
+    """使用共享会话发送请求，未指定超时时使用默认的（连接超时, 读取超时）"""
+    kwargs.setdefault(
+        "timeout", (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+    )
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> "requests.Response":
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> "requests.Response":
+    return request("POST", url, **kwargs)
+
+
+class ResponseLimitError(Exception):
+    """响应体超过大小上限或下载超过总时长"""
+
+
+def _bound_read_timeout(response: "requests.Response", deadline: float):
+    """把底层 socket 的读取超时收紧到 deadline 之前，单次读取不会越过总时长"""
+    sock = getattr(getattr(response.raw, "connection", None), "sock", None)
+    if sock is None:
+        return
+    remaining = max(deadline - time.monotonic(), 0.001)
+    current = sock.gettimeout()
+    sock.settimeout(remaining if current is None else min(current, remaining))
+
+
+def iter_limited(
+    response: "requests.Response", max_bytes: int, deadline: Optional[float] = None
+) -> Iterator[bytes]:
+    """
+    分块读取 stream=True 的响应体（已解压），超过 max_bytes 字节或
+    超过 deadline（time.monotonic() 时间点）时中止。
+
+    每次只读已经到达的数据（read1），不等凑满一块；读取超时也不超过剩余时间，
+    持续慢速发送的服务器不会让下载越过 deadline。
+    不根据 Content-Length 提前拒绝：调用方取满条目后会提前停止读取。
+    """
+    read1 = getattr(response.raw, "read1", None)
+    if read1 is None:
+        # urllib3 1.x 没有 read1，只能在块之间检查总时长
+        chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+    else:
+        chunks = _iter_read1(response, read1, deadline)
+    received = 0
+    for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise ResponseLimitError(f"响应体过大: 超过上限 {max_bytes} 字节")
+        if deadline is not None and time.monotonic() > deadline:
+            raise ResponseLimitError("下载超时: 超过总时长限制")
+        yield chunk
+
+
+def _iter_read1(response: "requests.Response", read1, deadline: Optional[float]):
+    import requests
+    from urllib3.exceptions import HTTPError
+
+    while True:
+        if deadline is not None:
+            _bound_read_timeout(response, deadline)
+        try:
+            chunk = read1(CHUNK_SIZE, decode_content=True)
+        except HTTPError as e:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise ResponseLimitError("下载超时: 超过总时长限制") from e
+            # 与 iter_content 一样转换为 requests 的异常
+            raise requests.exceptions.ConnectionError(e) from e
+        if not chunk:
+            return
+        yield chunk
+
+
+async def aiter_limited(
+    response: "aiohttp.ClientResponse", max_bytes: int
+) -> AsyncIterator[bytes]:
+    """异步分块读取响应体，超过 max_bytes 字节时中止，总时长由会话的 total 超时限制"""
+    received = 0
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        received += len(chunk)
+        if received > max_bytes:
+            raise ResponseLimitError(f"响应体过大: 超过上限 {max_bytes} 字节")
+        yield chunk
+
+
+def create_async_session() -> "aiohttp.ClientSession":
+    """创建异步会话，需要在事件循环中调用，由调用方负责关闭"""
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(
+        limit=config.FETCH_CONCURRENCY,
+        limit_per_host=config.HTTP_POOL_PER_HOST,
+        ttl_dns_cache=300,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=config.FETCH_DEADLINE,
+        sock_connect=config.HTTP_CONNECT_TIMEOUT,
+        sock_read=config.HTTP_READ_TIMEOUT,
+    )
+    return aiohttp.ClientSession(
+        connector=connector, headers=DEFAULT_HEADERS, timeout=timeout
+    )
+
+
+def host_limit(session: "aiohttp.ClientSession", url: str) -> "asyncio.Semaphore":
+    """
+    每个host同时进行的请求数上限，与连接池的 limit_per_host 相同。
+
+    在发起请求前排队：会话的 total 超时从拿到名额后才开始计算，
+    同一host下排队的源不会因为等待连接而超时。信号量按会话保存，会话属于一个事件循环。
+    """
+    import asyncio
+    from urllib.parse import urlsplit
+
+    limits = _host_limits.get(session)
+    if limits is None:
+        limits = _host_limits[session] = {}
+    host = urlsplit(url).netloc
+    semaphore = limits.get(host)
+    if semaphore is None:
+        semaphore = limits[host] = asyncio.Semaphore(config.HTTP_POOL_PER_HOST)
+    return semaphore
+
+
+def close_session():
+    """关闭共享会话，释放连接池"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
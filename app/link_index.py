@@ -0,0 +1,66 @@
+import threading
+from typing import Iterable, List, Set
+
+from app.local_store import get_connection, get_lock, register_schema
+
+register_schema("CREATE TABLE IF NOT EXISTS seen_links (link TEXT PRIMARY KEY)")
+
+_links: Set[str] = None
+_links_lock = threading.Lock()
+
+
+def _load() -> Set[str]:
+    """首次使用时从本地数据库加载全部已保存的文章链接到内存"""
+    global _links
+    if _links is None:
+        with _links_lock:
+            if _links is None:
+                with get_lock():
+                    rows = (
+                        get_connection()
+                        .execute("SELECT link FROM seen_links")
+                        .fetchall()
+                    )
+                _links = {row[0] for row in rows}
+    return _links
+
+
+def contains(link: str) -> bool:
+    """判断文章链接是否已经保存过"""
+    return link in _load()
+
+
+def filter_unseen(links: Iterable[str]) -> List[str]:
+    """返回索引中没有记录的链接，保持原有顺序"""
+    seen = _load()
+    return [link for link in links if link not in seen]
+
+
+def add_many(links: Iterable[str]) -> None:
+    """记录已保存的文章链接"""
+    seen = _load()
+    new_links = [link for link in set(links) if link and link not in seen]
+    if not new_links:
+        return
+    with get_lock():
+        get_connection().executemany(
+            "INSERT OR IGNORE INTO seen_links (link) VALUES (?)",
+            [(link,) for link in new_links],
+        )
+    seen.update(new_links)
+
+
+def add(link: str) -> None:
+    add_many([link])
+
+
+def clear() -> None:
+    """清空索引"""
+    _load()
+    with get_lock():
+        get_connection().execute("DELETE FROM seen_links")
+    _links.clear()
+
+
+def size() -> int:
+    return len(_load())
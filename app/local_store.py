@@ -0,0 +1,46 @@
+import os
+import sqlite3
+import threading
+from typing import List
+
+from config import config
+
+_lock = threading.RLock()
+_connection = None
+# 各模块登记的建表语句，以及当前连接上已经执行过的条数
+_schemas: List[str] = []
+_applied = 0
+
+
+def register_schema(*statements: str) -> None:
+    """
+    登记模块用到的建表语句（需要幂等，如 CREATE TABLE IF NOT EXISTS），
+    在下一次获取连接时执行，模块中不需要再自己检查表是否已创建。
+    """
+    with _lock:
+        _schemas.extend(statements)
+
+
+def get_connection() -> sqlite3.Connection:
+    """获取本地SQLite连接（进程内共享，首次调用时创建），并执行尚未执行的建表语句"""
+    global _connection, _applied
+    with _lock:
+        if _connection is None:
+            db_dir = os.path.dirname(config.LOCAL_DB_PATH)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            _connection = sqlite3.connect(
+                config.LOCAL_DB_PATH, check_same_thread=False, isolation_level=None
+            )
+            _connection.execute("PRAGMA journal_mode=WAL")
+            _connection.execute("PRAGMA synchronous=NORMAL")
+            _applied = 0
+        for statement in _schemas[_applied:]:
+            _connection.execute(statement)
+        _applied = len(_schemas)
+        return _connection
+
+
+def get_lock() -> threading.RLock:
+    """本地存储的写锁，多个线程共用同一个连接时需要持有"""
+    return _lock
@@ -9,45 +9,115 @@
 # @Date 2024-08-07
 #
 #
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
 
 from config import config
 
+_TEXT_FORMAT = "[%(levelname)s][%(asctime)s][%(filename)s:%(lineno)d] - %(message)s"
+_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
-# 重置日志句柄
-def _reset_logger(log):
-    for handler in log.handlers:
-        handler.close()
-        log.removeHandler(handler)
-        del handler
-    log.handlers.clear()
-    log.propagate = False
+# 后台写日志的监听线程
+_listener = None
+_setup_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志输出为一行JSON，便于日志平台检索"""
+
+    def format(self, record):
+        payload = {
+            "time": self.formatTime(record, _DATE_FORMAT),
+            "level": record.levelname,
+            "file": record.filename,
+            "line": record.lineno,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def _make_formatter() -> logging.Formatter:
+    if config.LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter(_TEXT_FORMAT, datefmt=_DATE_FORMAT)
+
+
+def _make_handlers():
     console_handle = logging.StreamHandler(sys.stdout)
-    console_handle.setFormatter(
-        logging.Formatter(
-            "[%(levelname)s][%(asctime)s][%(filename)s:%(lineno)d] - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-    )
-    file_handle = logging.FileHandler("run.log", encoding="utf-8")
-    file_handle.setFormatter(
-        logging.Formatter(
-            "[%(levelname)s][%(asctime)s][%(filename)s:%(lineno)d] - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
+    console_handle.setFormatter(_make_formatter())
+    handlers = [console_handle]
+    if config.LOG_FILE:
+        # 按大小滚动，第一次写日志时才打开文件
+        file_handle = logging.handlers.RotatingFileHandler(
+            config.LOG_FILE,
+            maxBytes=config.LOG_MAX_BYTES,
+            backupCount=config.LOG_BACKUP_COUNT,
+            encoding="utf-8",
+            delay=True,
         )
-    )
-    log.addHandler(file_handle)
-    log.addHandler(console_handle)
+        file_handle.setFormatter(_make_formatter())
+        handlers.insert(0, file_handle)
+    return handlers
 
 
-def _get_logger():
-    log = logging.getLogger("log")
-    _reset_logger(log)
-    # 根据当前环境配置日志级别
-    log.setLevel(config.LOG_LEVEL)
-    return log
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    默认的 prepare 会把异常格式化进消息并丢弃 exc_info，JSON 格式就拿不到单独的异常字段；
+    队列只在进程内传递，这里保留 exc_info，交给监听线程中的格式化器处理。
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def stop_logging():
+    """停止监听线程，写完队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging():
+    """
+    在主进程的入口调用：按配置设置日志级别，启动写控制台和日志文件的监听线程。
+
+    只导入本模块不会读取配置或创建线程；进程池的工作进程不调用，
+    它们的日志（只有警告和错误）交给 logging 默认的 stderr 输出，不会与主进程同时滚动日志文件。
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+        for handler in list(logger.handlers):
+            handler.close()
+            logger.removeHandler(handler)
+        logger.propagate = False
+
+        # 业务线程只把日志放入队列，由监听线程统一格式化并写入控制台和文件
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(_QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(
+            log_queue, *_make_handlers(), respect_handler_level=True
+        )
+        _listener.start()
+        # 根据当前环境配置日志级别
+        logger.setLevel(config.LOG_LEVEL)
+        # 进程退出前把队列中的日志写完
+        atexit.register(stop_logging)
 
 
-# 日志句柄
-logger = _get_logger()
+# 日志句柄；调用 setup_logging 之前按 logging 的默认方式输出警告和错误
+logger = logging.getLogger("log")
@@ -0,0 +1,64 @@
+import hashlib
+import time
+from typing import Optional
+
+from app.local_store import get_connection, get_lock, register_schema
+
+# 企业微信临时素材的有效期为 3 天，提前一小时视为过期
+MEDIA_TTL = 3 * 24 * 3600
+EXPIRY_MARGIN = 3600
+
+# 计算文件哈希时每次读取的字节数
+CHUNK_SIZE = 1024 * 1024
+
+register_schema(
+    """
+    CREATE TABLE IF NOT EXISTS media_cache (
+        key TEXT PRIMARY KEY,
+        media_id TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    """,
+)
+
+
+def file_sha256(filepath: str) -> str:
+    """分块读取文件计算 sha256，不把整个文件读进内存"""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get(key: str) -> Optional[str]:
+    """返回仍在有效期内的 media_id"""
+    with get_lock():
+        row = (
+            get_connection()
+            .execute(
+                "SELECT media_id FROM media_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+    return row[0] if row else None
+
+
+def save(key: str, media_id: str, created_at: Optional[float] = None):
+    """记录上传得到的 media_id，有效期从素材的创建时间算起"""
+    created_at = float(created_at) if created_at else time.time()
+    expires_at = created_at + MEDIA_TTL - EXPIRY_MARGIN
+    with get_lock():
+        conn = get_connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO media_cache (key, media_id, expires_at) VALUES (?, ?, ?)",
+            (key, media_id, expires_at),
+        )
+        # 顺带清理已过期的记录
+        conn.execute("DELETE FROM media_cache WHERE expires_at <= ?", (time.time(),))
+
+
+def delete(key: str):
+    with get_lock():
+        get_connection().execute("DELETE FROM media_cache WHERE key = ?", (key,))
@@ -0,0 +1,256 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.log import logger
+from config import config
+
+# 流水线各阶段
+STAGE_FEED_QUERY = "notion_feed_query"
+STAGE_FETCH = "fetch"
+STAGE_PARSE = "parse"
+STAGE_DEDUP = "dedup"
+STAGE_CONVERT = "convert"
+STAGE_SAVE = "save"
+STAGE_STATUS = "status_update"
+STAGE_WEBHOOK = "webhook"
+
+# 耗时直方图的桶上限（秒）
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_PREFIX = "reading_copilot"
+
+# (stage, feed, host)
+Labels = Tuple[str, str, str]
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 4) if value is not None else None
+
+
+class Histogram:
+    """累计的耗时分布，同时统计成功和失败次数"""
+
+    def __init__(self) -> None:
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.errors = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float, ok: bool = True):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+                break
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        if not ok:
+            self.errors += 1
+
+    def merge(self, other: "Histogram"):
+        for i, value in enumerate(other.bucket_counts):
+            self.bucket_counts[i] += value
+        self.count += other.count
+        self.errors += other.errors
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按桶上限估算分位数，落在最后一个桶之外时返回最大值"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, value in zip(BUCKETS, self.bucket_counts):
+            seen += value
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "seconds_total": round(self.sum, 3),
+            "seconds_avg": round(self.sum / self.count, 4) if self.count else None,
+            "seconds_max": round(self.max, 4),
+            "seconds_p50": _round(self.quantile(0.5)),
+            "seconds_p95": _round(self.quantile(0.95)),
+        }
+
+
+def host_of(url: Optional[str]) -> str:
+    return urlparse(url).netloc if url else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _write_atomic(path: str, content: str):
+    """先写临时文件再替换，避免采集方读到写了一半的文件"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class Timing:
+    """timer() 返回的计时对象，adjust 用于扣除或补上不在代码块内的耗时"""
+
+    def __init__(self) -> None:
+        self.adjust = 0.0
+
+
+def feed_labels(rss_info) -> Dict[str, str]:
+    """RSS源相关阶段的标签，host 为RSS源的域名"""
+    return {"feed": rss_info.title or "", "host": host_of(rss_info.link)}
+
+
+class MetricsRegistry:
+    """
+    按 (阶段, RSS源, host) 统计调用次数、失败次数和耗时分布。
+
+    数据在进程内累计，常驻模式下各轮之间不清零，与 Prometheus 计数器的语义一致。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[Labels, Histogram] = {}
+        self.started_at = time.time()
+
+    def observe(
+        self, stage: str, seconds: float, feed: str = "", host: str = "", ok=True
+    ):
+        key = (stage, feed or "", host or "")
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds, ok)
+
+    @contextmanager
+    def timer(self, stage: str, feed: str = "", host: str = ""):
+        """统计代码块的耗时，代码块抛出异常时记为失败"""
+        started = time.perf_counter()
+        timing = Timing()
+        ok = False
+        try:
+            yield timing
+            ok = True
+        finally:
+            elapsed = max(time.perf_counter() - started + timing.adjust, 0.0)
+            self.observe(stage, elapsed, feed, host, ok)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    def _copy(self) -> Dict[Labels, Histogram]:
+        with self._lock:
+            copied = {}
+            for key, histogram in self._histograms.items():
+                copied[key] = Histogram()
+                copied[key].merge(histogram)
+            return copied
+
+    def summary(self) -> dict:
+        """按阶段汇总，并按RSS源、host拆分"""
+        histograms = self._copy()
+        stages: Dict[str, Histogram] = {}
+        feeds: Dict[str, Dict[str, Histogram]] = {}
+        hosts: Dict[str, Dict[str, Histogram]] = {}
+        for (stage, feed, host), histogram in histograms.items():
+            stages.setdefault(stage, Histogram()).merge(histogram)
+            if feed:
+                feeds.setdefault(feed, {}).setdefault(stage, Histogram()).merge(
+                    histogram
+                )
+            if host:
+                hosts.setdefault(host, {}).setdefault(stage, Histogram()).merge(
+                    histogram
+                )
+
+        def summarize(groups):
+            return {
+                name: {stage: h.summary() for stage, h in sorted(group.items())}
+                for name, group in sorted(groups.items())
+            }
+
+        return {
+            "started_at": self.started_at,
+            "generated_at": time.time(),
+            "stages": {stage: h.summary() for stage, h in sorted(stages.items())},
+            "feeds": summarize(feeds),
+            "hosts": summarize(hosts),
+        }
+
+    def prometheus_text(self) -> str:
+        """Prometheus 文本格式，可由 node_exporter 的 textfile collector 采集"""
+        histograms = self._copy()
+        duration = f"{_PREFIX}_stage_duration_seconds"
+        errors = f"{_PREFIX}_stage_errors_total"
+        lines = [
+            f"# HELP {duration} Duration of pipeline stages.",
+            f"# TYPE {duration} histogram",
+        ]
+        error_lines = [
+            f"# HELP {errors} Failed pipeline stage calls.",
+            f"# TYPE {errors} counter",
+        ]
+        for (stage, feed, host), histogram in sorted(histograms.items()):
+            labels = {"stage": stage, "feed": feed, "host": host}
+            cumulative = 0
+            for bound, value in zip(BUCKETS, histogram.bucket_counts):
+                cumulative += value
+                bucket_labels = _format_labels({**labels, "le": str(bound)})
+                lines.append(f"{duration}_bucket{{{bucket_labels}}} {cumulative}")
+            base = _format_labels(labels)
+            inf_labels = _format_labels({**labels, "le": "+Inf"})
+            lines.append(f"{duration}_bucket{{{inf_labels}}} {histogram.count}")
+            lines.append(f"{duration}_sum{{{base}}} {histogram.sum:.6f}")
+            lines.append(f"{duration}_count{{{base}}} {histogram.count}")
+            error_lines.append(f"{errors}{{{base}}} {histogram.errors}")
+
+        lines.extend(error_lines)
+        lines.append(
+            f"# HELP {_PREFIX}_metrics_generated_timestamp_seconds Last export time."
+        )
+        lines.append(f"# TYPE {_PREFIX}_metrics_generated_timestamp_seconds gauge")
+        lines.append(f"{_PREFIX}_metrics_generated_timestamp_seconds {time.time():.0f}")
+        return "\n".join(lines) + "\n"
+
+    def export(self) -> dict:
+        """写出 Prometheus 文本文件和 JSON 汇总，路径为空时跳过，返回汇总结果"""
+        summary = self.summary()
+        try:
+            if config.METRICS_PROMETHEUS_PATH:
+                _write_atomic(config.METRICS_PROMETHEUS_PATH, self.prometheus_text())
+            if config.METRICS_JSON_PATH:
+                _write_atomic(
+                    config.METRICS_JSON_PATH,
+                    json.dumps(summary, ensure_ascii=False, indent=2),
+                )
+        except OSError as e:
+            logger.error(f"写出运行指标失败: {e}")
+        return summary
+
+
+# 进程内共用的指标
+registry = MetricsRegistry()
+observe = registry.observe
+timer = registry.timer
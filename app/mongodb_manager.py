@@ -1,24 +1,109 @@
-from pymongo import MongoClient
+import hashlib
+import threading
+from dataclasses import asdict, fields
+from typing import Iterable, List, Optional, Set
 
+from app.log import logger
 from app.model.article import Article
+from config import config
 
-# MongoDB 连接设置
-client = MongoClient("mongodb://localhost:27017/")  # 修改为你的MongoDB连接URL
-db = client.readCopilot  # 数据库名称
-articles_collection = db.articles  # 集合名称
+# 重复键错误码，并发写入同一篇文章时出现，可以忽略
+DUPLICATE_KEY_ERROR = 11000
+# $in 查询每批的链接数量
+IN_QUERY_BATCH = 1000
 
+_collection = None
+_lock = threading.Lock()
 
-def insert_article(article: Article):
-    """将文章插入到MongoDB中"""
-    articles_collection.insert_one(article.model_dump())
+_ARTICLE_FIELDS = {f.name for f in fields(Article)}
 
 
-def get_article(article_id: str) -> Article:
+def article_id(link: str) -> str:
+    """由文章链接生成稳定的文章ID"""
+    return hashlib.sha256(link.encode("utf-8")).hexdigest()[:32]
+
+
+def ensure_indexes(collection):
+    """link 和 id 建唯一索引，查重和按ID查询都走索引，同时防止重复写入"""
+    collection.create_index("link", unique=True, name="uniq_link")
+    collection.create_index("id", unique=True, name="uniq_id")
+
+
+def get_articles_collection():
+    """首次使用时才导入 pymongo、创建带连接池的客户端并确保索引存在"""
+    global _collection
+    if _collection is None:
+        with _lock:
+            if _collection is None:
+                from pymongo import MongoClient
+
+                client = MongoClient(
+                    config.MONGODB_URI,
+                    maxPoolSize=config.MONGODB_POOL_SIZE,
+                    retryWrites=True,
+                )
+                collection = client[config.MONGODB_DB].articles  # 集合名称
+                ensure_indexes(collection)
+                _collection = collection
+    return _collection
+
+
+def to_document(article: Article) -> dict:
+    document = asdict(article)
+    document["id"] = article_id(article.link)
+    return document
+
+
+def from_document(document: dict) -> Article:
+    return Article(**{k: v for k, v in document.items() if k in _ARTICLE_FIELDS})
+
+
+def insert_articles(articles: Iterable[Article]) -> int:
+    """
+    批量插入文章，返回新插入的数量。
+
+    使用无序批量写入，已存在的文章（重复键）跳过，不影响其他文章写入。
+    """
+    from pymongo.errors import BulkWriteError
+
+    documents = [to_document(article) for article in articles]
+    if not documents:
+        return 0
+    try:
+        result = get_articles_collection().insert_many(documents, ordered=False)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        other_errors = [err for err in errors if err.get("code") != DUPLICATE_KEY_ERROR]
+        if other_errors:
+            raise
+        logger.debug(f"跳过 {len(errors)} 篇已存在的文章")
+        return e.details.get("nInserted", 0)
+
+
+def insert_article(article: Article) -> bool:
+    """将文章插入到MongoDB中，文章已存在时返回 False"""
+    return insert_articles([article]) == 1
+
+
+def get_article(article_id: str) -> Optional[Article]:
     """从MongoDB中获取文章"""
-    article = articles_collection.find_one({"id": article_id})
-    return Article(**article)
+    document = get_articles_collection().find_one({"id": article_id}, {"_id": 0})
+    return from_document(document) if document else None
+
+
+def find_existing_links(article_links: Iterable[str]) -> Set[str]:
+    """批量查询已存在的文章链接，每批用一次 $in 查询"""
+    links: List[str] = list(dict.fromkeys(link for link in article_links if link))
+    existing = set()
+    collection = get_articles_collection()
+    for i in range(0, len(links), IN_QUERY_BATCH):
+        batch = links[i : i + IN_QUERY_BATCH]
+        cursor = collection.find({"link": {"$in": batch}}, {"link": 1, "_id": 0})
+        existing.update(document["link"] for document in cursor)
+    return existing
 
 
 def check_article_existence(article_links: str) -> bool:
     """检查文章是否存在于MongoDB中"""
-    return articles_collection.find_one({"link": article_links}) is not None
+    return bool(find_existing_links([article_links]))
@@ -0,0 +1,363 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app import metrics
+from app.log import logger
+from app.model.article import Article
+from app.rate_limiter import AdaptiveRateLimiter
+from app.send_message import WebhookError, post_feishu_text, post_wechat_text
+from config import config
+
+# 企业微信接口调用超过频率限制的错误码
+WECHAT_ERRCODE_FREQ_LIMIT = 45009
+# 企业微信应用 access_token 无效或过期，刷新后重试
+WECHAT_WORK_ERRCODE_TOKEN = (40014, 42001)
+# 飞书机器人请求过于频繁
+FEISHU_ERRCODE_FREQ_LIMIT = 9499
+
+# 飞书文本消息请求体上限为 20KB，留出 JSON 包装的余量
+FEISHU_MESSAGE_MAX_BYTES = 16 * 1024
+# 企业微信应用文本消息上限
+WECHAT_WORK_MESSAGE_MAX_BYTES = 2048
+
+_SECTION_SEPARATOR = "\n\n"
+
+# (RSS源名称, 写入成功的文章)
+DigestItem = Tuple[str, List[Article]]
+
+
+def _is_http_retryable(e: Exception) -> bool:
+    """429、5xx 和网络错误需要退避重试"""
+    from requests.exceptions import ConnectionError, Timeout
+
+    if isinstance(e, (ConnectionError, Timeout)):
+        return True
+    response = getattr(e, "response", None)
+    status = getattr(response, "status_code", None)
+    return status is not None and (status == 429 or status >= 500)
+
+
+def _get_http_retry_after(e: Exception) -> Optional[float]:
+    try:
+        return float(e.response.headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _utf8_len(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def _truncate(text: str, max_bytes: int) -> str:
+    return text.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore")
+
+
+def format_section(
+    feed_title: str, articles: List[Article], max_bytes: int
+) -> List[str]:
+    """
+    一个RSS源的新文章格式化为消息段落，超过 max_bytes 时拆成多段，每段都带上源名称
+    """
+    footer = f"@{feed_title}"
+    budget = max_bytes - _utf8_len("\n" + footer)
+    sections = []
+    lines: List[str] = []
+    size = 0
+    for article in articles:
+        line = _truncate(f"{article.title}\n{article.link}\n", budget)
+        line_size = _utf8_len(line) + (1 if lines else 0)
+        if lines and size + line_size > budget:
+            sections.append("\n".join(lines + [footer]))
+            lines, size = [], 0
+            line_size = _utf8_len(line)
+        lines.append(line)
+        size += line_size
+    if lines:
+        sections.append("\n".join(lines + [footer]))
+    return sections
+
+
+def pack_messages(sections: List[str], max_bytes: int) -> List[str]:
+    """
+    把段落装进尽量少的消息，每条消息不超过 max_bytes 字节：
+    依次放入第一条还放得下的消息（first-fit），消息内保持段落的先后顺序
+    """
+    messages: List[List[str]] = []
+    sizes: List[int] = []
+    separator_size = _utf8_len(_SECTION_SEPARATOR)
+    for section in sections:
+        size = _utf8_len(section)
+        for i, used in enumerate(sizes):
+            if used + separator_size + size <= max_bytes:
+                messages[i].append(section)
+                sizes[i] = used + separator_size + size
+                break
+        else:
+            messages.append([section])
+            sizes.append(size)
+    return [_SECTION_SEPARATOR.join(message) for message in messages]
+
+
+def build_messages(items: List[DigestItem], max_bytes: int) -> List[str]:
+    sections = []
+    for feed_title, articles in items:
+        sections.extend(format_section(feed_title, articles, max_bytes))
+    return pack_messages(sections, max_bytes)
+
+
+@dataclass
+class Channel:
+    """
+    一个通知渠道：send 发送一条消息，失败时抛出异常；
+    limiter 决定该渠道的发送速率和重试退避策略。
+    """
+
+    name: str
+    send: Callable[[str], None]
+    limiter: AdaptiveRateLimiter
+    max_bytes: int
+
+
+@dataclass
+class DeliveryReport:
+    """一个渠道一次投递的结果"""
+
+    channel: str
+    messages: int = 0
+    sent: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+
+def _wechat_bot_channel() -> Channel:
+    def is_throttled(e: Exception) -> bool:
+        if isinstance(e, WebhookError):
+            return e.errcode == WECHAT_ERRCODE_FREQ_LIMIT
+        return _is_http_retryable(e)
+
+    def get_retry_after(e: Exception) -> Optional[float]:
+        # 群机器人按分钟限频，超限后等到下一个窗口
+        if isinstance(e, WebhookError):
+            return 60.0
+        return _get_http_retry_after(e)
+
+    return Channel(
+        name="wechat",
+        send=post_wechat_text,
+        limiter=AdaptiveRateLimiter(
+            max_rate=config.WECHAT_RATE_LIMIT / 60,
+            min_rate=config.WECHAT_RATE_LIMIT / 240,
+            max_retries=config.WECHAT_MAX_RETRIES,
+            is_throttled=is_throttled,
+            get_retry_after=get_retry_after,
+        ),
+        max_bytes=config.WECHAT_MESSAGE_MAX_BYTES,
+    )
+
+
+def _feishu_channel() -> Channel:
+    def is_throttled(e: Exception) -> bool:
+        if isinstance(e, WebhookError):
+            return e.errcode == FEISHU_ERRCODE_FREQ_LIMIT
+        return _is_http_retryable(e)
+
+    return Channel(
+        name="feishu",
+        send=post_feishu_text,
+        limiter=AdaptiveRateLimiter(
+            max_rate=config.FEISHU_RATE_LIMIT / 60,
+            min_rate=config.FEISHU_RATE_LIMIT / 240,
+            max_retries=config.FEISHU_MAX_RETRIES,
+            is_throttled=is_throttled,
+            get_retry_after=_get_http_retry_after,
+        ),
+        max_bytes=FEISHU_MESSAGE_MAX_BYTES,
+    )
+
+
+def _wechat_work_channel() -> Channel:
+    from app.wechat_work import WechatWork
+
+    client = None
+    users = [user for user in config.WECHAT_WORK_USERS.split(",") if user]
+    lock = threading.Lock()
+
+    def send(content: str):
+        nonlocal client
+        with lock:
+            if client is None:
+                client = WechatWork(
+                    corpid=config.WECHAT_WORK_CORPID,
+                    appid=config.WECHAT_WORK_AGENTID,
+                    corpsecret=config.WECHAT_WORK_SECRET,
+                )
+        for _ in range(2):
+            access_token = client.get_access_token()
+            result = client.send_message(
+                "text", users, content=content, access_token=access_token
+            )
+            errcode = result.get("errcode")
+            if errcode not in WECHAT_WORK_ERRCODE_TOKEN:
+                break
+            # 只清除这次用的 token（其他线程可能已经刷新过），重新获取后立即重发一次；
+            # token 失效不是限频，不经过限流器的重试和降速
+            client.invalidate_access_token(access_token)
+        if errcode != 0:
+            raise WebhookError(errcode, result.get("errmsg"))
+
+    def is_throttled(e: Exception) -> bool:
+        if isinstance(e, WebhookError):
+            return e.errcode == WECHAT_ERRCODE_FREQ_LIMIT
+        return _is_http_retryable(e)
+
+    def get_retry_after(e: Exception) -> Optional[float]:
+        if isinstance(e, WebhookError):
+            return 60.0
+        return _get_http_retry_after(e)
+
+    return Channel(
+        name="wechat_work",
+        send=send,
+        limiter=AdaptiveRateLimiter(
+            max_rate=config.WECHAT_WORK_RATE_LIMIT / 60,
+            min_rate=config.WECHAT_WORK_RATE_LIMIT / 240,
+            max_retries=config.WECHAT_MAX_RETRIES,
+            is_throttled=is_throttled,
+            get_retry_after=get_retry_after,
+        ),
+        max_bytes=WECHAT_WORK_MESSAGE_MAX_BYTES,
+    )
+
+
+def configured_channels() -> List[Channel]:
+    """按配置启用通知渠道"""
+    channels = []
+    if config.WEBHOOK_URL_WECHAT:
+        channels.append(_wechat_bot_channel())
+    if config.WEBHOOK_URL_FEISHU:
+        channels.append(_feishu_channel())
+    if config.WECHAT_WORK_CORPID and config.WECHAT_WORK_SECRET:
+        channels.append(_wechat_work_channel())
+    return channels
+
+
+class NotificationDispatcher:
+    """
+    把消息并行投递到所有启用的渠道：每个渠道一个后台任务，渠道内按各自的限流策略依次发送，
+    调用方只负责提交，不等待发送完成。
+    """
+
+    def __init__(self, channels: Optional[List[Channel]] = None) -> None:
+        self._channels = channels
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: List[Future] = []
+        self._last_reports: Dict[str, dict] = {}
+
+    @property
+    def channels(self) -> List[Channel]:
+        with self._lock:
+            if self._channels is None:
+                self._channels = configured_channels()
+            return self._channels
+
+    def _deliver(self, channel: Channel, items: List[DigestItem]) -> DeliveryReport:
+        messages = build_messages(items, channel.max_bytes)
+        report = DeliveryReport(channel=channel.name, messages=len(messages))
+        started = time.perf_counter()
+        for message in messages:
+            sent_at = time.perf_counter()
+            try:
+                channel.limiter.call(channel.send, message)
+                report.sent += 1
+                ok = True
+            except Exception as e:
+                logger.error(f"通知发送失败 [{channel.name}]: {e}")
+                report.failed += 1
+                report.errors.append(str(e))
+                ok = False
+            # webhook 阶段的 host 标签为渠道名
+            metrics.observe(
+                metrics.STAGE_WEBHOOK,
+                time.perf_counter() - sent_at,
+                host=channel.name,
+                ok=ok,
+            )
+        report.seconds = round(time.perf_counter() - started, 3)
+        logger.info(
+            f"通知投递完成 [{channel.name}]: {report.messages} 条消息，"
+            f"成功 {report.sent} 条，失败 {report.failed} 条"
+        )
+        with self._lock:
+            self._last_reports[channel.name] = asdict(report)
+        return report
+
+    def submit(self, items: List[DigestItem]) -> List[Future]:
+        """提交一批汇总内容，立即返回，每个渠道对应一个 Future[DeliveryReport]"""
+        channels = self.channels
+        if not items or not channels:
+            return []
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=len(channels), thread_name_prefix="notify"
+                )
+            futures = [
+                self._executor.submit(self._deliver, channel, items)
+                for channel in channels
+            ]
+            self._futures = [f for f in self._futures if not f.done()] + futures
+        return futures
+
+    def wait(self, timeout: Optional[float] = None) -> List[DeliveryReport]:
+        """等待已提交的投递完成（进程退出前调用），返回已完成的投递结果"""
+        with self._lock:
+            futures, self._futures = self._futures, []
+        done, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            logger.warning(f"{len(not_done)} 个通知投递任务超时未完成")
+        return [f.result() for f in done if f.exception() is None]
+
+    def last_reports(self) -> Dict[str, dict]:
+        """各渠道最近一次的投递结果"""
+        with self._lock:
+            return dict(self._last_reports)
+
+
+class NotificationDigest:
+    """
+    汇总一次运行中各RSS源的新文章，运行结束时交给 dispatcher 合并成尽量少的消息发送。
+    """
+
+    def __init__(self, dispatcher: NotificationDispatcher) -> None:
+        self.dispatcher = dispatcher
+        self._lock = threading.Lock()
+        self._items: List[DigestItem] = []
+
+    def add(self, feed_title: str, articles: List[Article]):
+        if not articles:
+            return
+        with self._lock:
+            self._items.append((feed_title, list(articles)))
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def flush(self) -> dict:
+        """把汇总内容提交给 dispatcher 并清空，不等待发送完成"""
+        with self._lock:
+            items, self._items = self._items, []
+        futures = self.dispatcher.submit(items)
+        if items and not futures:
+            logger.info(f"未配置通知渠道，跳过 {len(items)} 个源的新文章通知")
+        return {"feeds": len(items), "deliveries": len(futures)}
+
+
+# 进程内共用的通知分发和汇总
+dispatcher = NotificationDispatcher()
+digest = NotificationDigest(dispatcher)
@@ -1,13 +1,85 @@
-from typing import List
-
-from notion_client import Client
+import threading
+from typing import Iterator, List, Optional
 
+from app import content_processor, link_index, metrics
 from app.log import logger, logging
 from app.model.article import Article
 from app.model.rss_item import RSSItem
+from app.rate_limiter import AdaptiveRateLimiter
 from config import config
 
-notion = Client(auth=config.NOTION_KEY, log_level=logging.WARNING)
+
+def _is_throttled(e: Exception) -> bool:
+    """429 和 5xx 需要退避重试"""
+    from notion_client.errors import HTTPResponseError
+
+    return isinstance(e, HTTPResponseError) and (e.status == 429 or e.status >= 500)
+
+
+def _get_retry_after(e: Exception) -> Optional[float]:
+    try:
+        return float(e.headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+_limiter = None
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_notion_limiter() -> AdaptiveRateLimiter:
+    """进程内所有Notion API调用共用的限流器，首次使用时按配置创建"""
+    global _limiter
+    if _limiter is None:
+        with _client_lock:
+            if _limiter is None:
+                _limiter = AdaptiveRateLimiter(
+                    max_rate=config.NOTION_RATE_LIMIT,
+                    max_retries=config.NOTION_MAX_RETRIES,
+                    is_throttled=_is_throttled,
+                    get_retry_after=_get_retry_after,
+                )
+    return _limiter
+
+
+def get_notion_client():
+    """首次使用时才导入 notion_client 并创建客户端"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from notion_client import Client
+
+                config.validate()
+                _client = Client(
+                    auth=config.NOTION_KEY,
+                    base_url=config.NOTION_BASE_URL,
+                    log_level=logging.WARNING,
+                )
+    return _client
+
+
+class RateLimitedEndpoint:
+    """代理Notion API的endpoint，所有请求都经过限流器"""
+
+    def __init__(self, get_endpoint) -> None:
+        self._get_endpoint = get_endpoint
+
+    def __getattr__(self, name):
+        from notion_client.api_endpoints import Endpoint
+
+        attr = getattr(self._get_endpoint(), name)
+        if isinstance(attr, Endpoint):
+            return RateLimitedEndpoint(lambda: attr)
+        if callable(attr):
+            return lambda *args, **kwargs: get_notion_limiter().call(
+                attr, *args, **kwargs
+            )
+        return attr
+
+
+notion = RateLimitedEndpoint(get_notion_client)
 
 
 # 解析Notion返回的RSS项数据
@@ -27,33 +99,70 @@ def parse_rss_item(item) -> RSSItem:
     )
 
 
-# 获取所有激活状态的RSS源
-def get_active_rss_feeds() -> List[RSSItem]:
-    """获取开启的RSS链接，并返回RSSItem对象列表"""
-    active_rss_feeds = []
-
-    response = notion.databases.query(
-        database_id=config.NOTION_DB_RSS,
-        filter={"property": "disabled", "checkbox": {"equals": False}},
-        sorts=[
+# 分页获取所有激活状态的RSS源
+def iter_active_rss_feeds() -> Iterator[RSSItem]:
+    """按页查询开启的RSS链接，逐个返回RSSItem对象，后续页面在遍历时才会请求"""
+    query = {
+        "database_id": config.NOTION_DB_RSS,
+        "filter": {"property": "disabled", "checkbox": {"equals": False}},
+        "sorts": [
             {"property": "status", "direction": "ascending"},
             {"property": "updated", "direction": "descending"},
         ],
-    )
+        "page_size": 100,
+    }
 
-    # 解析Notion返回的RSS feed数据
-    active_rss_feeds = [parse_rss_item(item) for item in response["results"]]
+    while True:
+        with metrics.timer(metrics.STAGE_FEED_QUERY):
+            response = notion.databases.query(**query)
 
-    return active_rss_feeds
+        # 解析Notion返回的RSS feed数据
+        for item in response["results"]:
+            yield parse_rss_item(item)
+
+        if not response.get("has_more"):
+            break
+        query["start_cursor"] = response["next_cursor"]
+
+
+# 获取所有激活状态的RSS源
+def get_active_rss_feeds() -> List[RSSItem]:
+    """获取开启的RSS链接，并返回RSSItem对象列表"""
+    return list(iter_active_rss_feeds())
 
 
 # 将文章保存至Notion数据库
 def save_article_to_notion(article_data: Article):
-    """保存文章到Notion的文章库"""
-    notion.pages.create(
-        parent={"database_id": config.NOTION_DB_READER},
-        properties=article_data.to_notion_properties(),
-    )
+    """保存文章到Notion的文章库，正文转换为页面的子块一起创建"""
+    from notion_client.errors import APIErrorCode, APIResponseError
+
+    properties = article_data.to_notion_properties()
+    children = []
+    try:
+        children = content_processor.page_children(
+            article_data.content or "", article_data.link
+        )
+    except Exception as e:
+        logger.error(f"生成文章正文块失败: {article_data.link}, {e}")
+
+    try:
+        notion.pages.create(
+            parent={"database_id": config.NOTION_DB_READER},
+            properties=properties,
+            children=children,
+        )
+    except APIResponseError as e:
+        # 正文中有Notion不接受的内容（如图片地址）时，退回只保存属性
+        if not children or e.code != APIErrorCode.ValidationError:
+            raise
+        logger.warning(
+            f"文章正文未通过Notion校验，只保存属性: {article_data.link}, {e}"
+        )
+        notion.pages.create(
+            parent={"database_id": config.NOTION_DB_READER},
+            properties=properties,
+        )
+    link_index.add(article_data.link)
 
 
 def update_rss_status(rss_id, status, updated_time, remarks):
@@ -102,3 +211,40 @@ def check_articles_existence_in_notion(article_links):
     except Exception as e:
         logger.error(f"查询Notion文章失败: {e}")
         raise Exception(f"查询Notion文章失败: {e}")
+
+
+def find_existing_links(article_links) -> set:
+    """查询已存在的文章链接，只有本地索引中没有记录的链接才会查询Notion"""
+    unseen_links = link_index.filter_unseen(article_links)
+    existing_links = set(article_links) - set(unseen_links)
+
+    if unseen_links:
+        found_links = check_articles_existence_in_notion(unseen_links)
+        link_index.add_many(found_links)
+        existing_links.update(found_links)
+
+    return existing_links
+
+
+def rebuild_link_index() -> int:
+    """从Notion文章库全量拉取文章链接，重建本地索引，返回链接数量"""
+    links = []
+    start_cursor = None
+    while True:
+        kwargs = {"database_id": config.NOTION_DB_READER, "page_size": 100}
+        if start_cursor:
+            kwargs["start_cursor"] = start_cursor
+        response = notion.databases.query(**kwargs)
+        links.extend(
+            item["properties"]["link"]["url"]
+            for item in response["results"]
+            if item["properties"]["link"]["url"]
+        )
+        if not response.get("has_more"):
+            break
+        start_cursor = response["next_cursor"]
+
+    link_index.clear()
+    link_index.add_many(links)
+    logger.info(f"本地文章链接索引重建完成，共 {link_index.size()} 条")
+    return link_index.size()
@@ -0,0 +1,169 @@
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from app import link_index
+from app.local_store import get_connection, get_lock, register_schema
+from app.log import logger
+from app.notion_manager import notion
+from config import config
+
+
+@dataclass
+class ReaderPage:
+    page_id: str
+    link: Optional[str]
+    title: Optional[str]
+    source_id: Optional[str]
+    date: Optional[str]
+    last_edited_time: str
+
+
+register_schema(
+    """
+    CREATE TABLE IF NOT EXISTS reader_pages (
+        page_id TEXT PRIMARY KEY,
+        link TEXT,
+        title TEXT,
+        source_id TEXT,
+        date TEXT,
+        last_edited_time TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_reader_pages_link ON reader_pages (link)",
+    "CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)",
+)
+
+
+def _get_state(key: str) -> Optional[str]:
+    with get_lock():
+        row = (
+            get_connection()
+            .execute("SELECT value FROM sync_state WHERE key = ?", (key,))
+            .fetchone()
+        )
+    return row[0] if row else None
+
+
+def _set_state(key: str, value: str):
+    with get_lock():
+        get_connection().execute(
+            "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+            (key, value),
+        )
+
+
+def parse_reader_page(item) -> ReaderPage:
+    """将Notion API返回的文章页面解析为ReaderPage对象"""
+    properties = item["properties"]
+    title = properties.get("title", {}).get("title") or []
+    source = (properties.get("source") or {}).get("relation") or []
+    date = (properties.get("date") or {}).get("date")
+    return ReaderPage(
+        page_id=item["id"],
+        link=(properties.get("link") or {}).get("url"),
+        title=title[0]["plain_text"] if title else None,
+        source_id=source[0]["id"] if source else None,
+        date=date["start"] if date else None,
+        last_edited_time=item["last_edited_time"],
+    )
+
+
+def sync(full: bool = False) -> int:
+    """
+    同步Notion文章库到本地镜像。
+
+    首次（或 full=True）时分页全量拉取，之后只拉取 last_edited_time
+    不早于上次同步时间的页面。同步到的链接同时写入本地文章链接索引。
+
+    Returns:
+        int: 本次同步的页面数量
+    """
+    last_synced = None if full else _get_state("reader_last_edited_time")
+
+    query = {
+        "database_id": config.NOTION_DB_READER,
+        "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}],
+        "page_size": 100,
+    }
+    if last_synced:
+        query["filter"] = {
+            "timestamp": "last_edited_time",
+            "last_edited_time": {"on_or_after": last_synced},
+        }
+
+    synced = 0
+    latest = last_synced
+    while True:
+        response = notion.databases.query(**query)
+        pages = [parse_reader_page(item) for item in response["results"]]
+        with get_lock():
+            get_connection().executemany(
+                """
+                INSERT OR REPLACE INTO reader_pages
+                    (page_id, link, title, source_id, date, last_edited_time)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        p.page_id,
+                        p.link,
+                        p.title,
+                        p.source_id,
+                        p.date,
+                        p.last_edited_time,
+                    )
+                    for p in pages
+                ],
+            )
+        link_index.add_many(p.link for p in pages if p.link)
+
+        synced += len(pages)
+        for page in pages:
+            if latest is None or page.last_edited_time > latest:
+                latest = page.last_edited_time
+
+        if not response.get("has_more"):
+            break
+        query["start_cursor"] = response["next_cursor"]
+
+    if latest:
+        _set_state("reader_last_edited_time", latest)
+    logger.info(f"Notion文章库同步完成，本次同步 {synced} 条，共 {count()} 条")
+    return synced
+
+
+def get_page_by_link(link: str) -> Optional[ReaderPage]:
+    """按文章链接查询本地镜像"""
+    with get_lock():
+        row = (
+            get_connection()
+            .execute(
+                """
+                SELECT page_id, link, title, source_id, date, last_edited_time
+                FROM reader_pages WHERE link = ?
+                """,
+                (link,),
+            )
+            .fetchone()
+        )
+    return ReaderPage(*row) if row else None
+
+
+def iter_pages(source_id: Optional[str] = None) -> Iterator[ReaderPage]:
+    """遍历本地镜像中的文章，可按来源过滤"""
+    sql = "SELECT page_id, link, title, source_id, date, last_edited_time FROM reader_pages"
+    params = ()
+    if source_id:
+        sql += " WHERE source_id = ?"
+        params = (source_id,)
+    with get_lock():
+        rows = get_connection().execute(sql, params).fetchall()
+    for row in rows:
+        yield ReaderPage(*row)
+
+
+def count() -> int:
+    with get_lock():
+        return (
+            get_connection().execute("SELECT COUNT(*) FROM reader_pages").fetchone()[0]
+        )
@@ -0,0 +1,133 @@
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from app import metrics, sinks
+from app.log import logger
+from app.model.article import Article
+from app.notion_manager import update_rss_status
+from config import config
+
+
+@dataclass
+class WriteReport:
+    """一次运行中写入Notion的结果统计"""
+
+    articles_saved: int = 0
+    articles_failed: int = 0
+    status_updated: int = 0
+    status_failed: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+class NotionWriter:
+    """
+    Notion写入队列：抓取线程只负责入队，由固定数量的写线程按限流速度依次写入，
+    运行结束时调用 flush 等待队列清空并获取统计结果。
+    """
+
+    def __init__(self, workers: Optional[int] = None) -> None:
+        # 未指定时在第一次写入时按配置 NOTION_WRITE_WORKERS 启动写线程
+        self._workers = workers
+        self._queue = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._report = WriteReport()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._threads:
+                return
+            workers = self._workers or config.NOTION_WRITE_WORKERS
+            for i in range(workers):
+                thread = threading.Thread(
+                    target=self._run, name=f"notion-writer-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            try:
+                task()
+            except Exception as e:
+                logger.error(f"Notion写入任务异常: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _record(self, **counts):
+        with self._lock:
+            for key, value in counts.items():
+                setattr(self._report, key, getattr(self._report, key) + value)
+
+    def _record_error(self, message: str):
+        logger.error(message)
+        with self._lock:
+            self._report.errors.append(message)
+
+    def submit_articles(
+        self,
+        articles: List[Article],
+        on_complete: Optional[Callable[[List[Article]], None]] = None,
+        labels: Optional[Dict[str, str]] = None,
+    ):
+        """
+        将一个RSS源的新文章加入写入队列。
+
+        on_complete 在这批文章全部写入后由写线程调用，参数为写入成功的文章列表；
+        labels 为运行指标的标签（feed、host）。
+        """
+        if not articles:
+            return
+
+        def task():
+            try:
+                with metrics.timer(metrics.STAGE_SAVE, **(labels or {})):
+                    saved = sinks.get_sink().write_many(articles)
+            except Exception as e:
+                saved = []
+                self._record_error(f"批量保存 {len(articles)} 篇文章失败: {e}")
+            self._record(
+                articles_saved=len(saved), articles_failed=len(articles) - len(saved)
+            )
+            if on_complete:
+                on_complete(saved)
+
+        self._ensure_started()
+        self._queue.put(task)
+
+    def submit_status(self, rss_id, status, updated_time, remarks, labels=None):
+        """将RSS源状态更新加入写入队列"""
+
+        def task():
+            try:
+                with metrics.timer(metrics.STAGE_STATUS, **(labels or {})):
+                    update_rss_status(
+                        rss_id=rss_id,
+                        status=status,
+                        updated_time=updated_time,
+                        remarks=remarks,
+                    )
+                self._record(status_updated=1)
+            except Exception as e:
+                self._record(status_failed=1)
+                self._record_error(f"更新RSS状态失败: {rss_id}, {e}")
+
+        self._ensure_started()
+        self._queue.put(task)
+
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def flush(self) -> WriteReport:
+        """等待队列中的写入全部完成，返回并重置统计结果"""
+        self._queue.join()
+        with self._lock:
+            report, self._report = self._report, WriteReport()
+        return report
+
+
+# 进程内共用的写入队列
+writer = NotionWriter()
@@ -0,0 +1,88 @@
+from typing import Callable, Iterable, Optional
+
+from app import fetch_engine, metrics, notion_mirror, notifier, scheduler
+from app.log import logger
+from app.model.rss_item import RSSItem
+from app.notion_manager import get_notion_limiter, iter_active_rss_feeds
+from app.notion_writer import writer
+from config import config
+
+
+def sync_mirror():
+    """增量同步Notion文章库到本地，失败不影响本次抓取"""
+    if not config.NOTION_MIRROR_ENABLED or config.ARTICLE_SINK != "notion":
+        return
+    try:
+        notion_mirror.sync()
+    except Exception as e:
+        logger.error(f"同步Notion文章库失败: {e}")
+
+
+def select_due_feeds(
+    rss_feeds: Iterable[RSSItem], force_all: bool = False
+) -> Iterable[RSSItem]:
+    """只抓取到了抓取时间的源"""
+    if not config.SCHEDULER_ENABLED:
+        return rss_feeds
+    return scheduler.filter_due(
+        rss_feeds, force_all=force_all or config.FORCE_ALL_FEEDS
+    )
+
+
+def finish_run() -> dict:
+    """等待Notion写入队列清空，输出运行指标，并返回本次运行的统计结果"""
+    logger.info(f"抓取完成，等待 {writer.pending()} 个Notion写入任务")
+    report = writer.flush()
+    logger.info(
+        f"Notion写入完成: 保存文章 {report.articles_saved} 篇，失败 {report.articles_failed} 篇，"
+        f"更新RSS状态 {report.status_updated} 次，失败 {report.status_failed} 次"
+    )
+
+    # 写入完成的回调已把新文章加入汇总，提交到各通知渠道后台发送，不等待结果
+    notification = notifier.digest.flush()
+    logger.info(
+        f"新文章通知: {notification['feeds']} 个源，"
+        f"提交到 {notification['deliveries']} 个渠道"
+    )
+
+    notion_stats = get_notion_limiter().stats()
+    logger.info(f"Notion API 调用统计: {notion_stats}")
+
+    # 输出各阶段的调用次数与耗时，常驻模式下每轮都会刷新
+    stages = metrics.registry.export()["stages"]
+    for stage, summary in stages.items():
+        logger.info(
+            f"阶段 {stage}: 调用 {summary['count']} 次，失败 {summary['errors']} 次，"
+            f"总耗时 {summary['seconds_total']}s，p95 {summary['seconds_p95']}s"
+        )
+    return {
+        "articles_saved": report.articles_saved,
+        "articles_failed": report.articles_failed,
+        "status_updated": report.status_updated,
+        "status_failed": report.status_failed,
+        "notion": notion_stats,
+        "notification": notification,
+        "stages": stages,
+    }
+
+
+def run_once(
+    force_all: bool = False,
+    rss_feeds: Optional[Iterable[RSSItem]] = None,
+    run_feeds: Callable[[Iterable[RSSItem]], None] = fetch_engine.run,
+) -> dict:
+    """
+    执行一次完整的抓取流程：同步文章库、筛选到期的源、抓取并写入Notion。
+
+    Args:
+        force_all: 忽略调度，抓取所有激活的源
+        rss_feeds: RSS源列表，默认边分页查询Notion边抓取
+        run_feeds: 执行抓取的引擎
+    """
+    sync_mirror()
+
+    if rss_feeds is None:
+        rss_feeds = iter_active_rss_feeds()
+    run_feeds(select_due_feeds(rss_feeds, force_all))
+
+    return finish_run()
@@ -0,0 +1,117 @@
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class TokenBucket:
+    """线程安全的令牌桶，按 rate 个/秒补充令牌，最多积累 capacity 个"""
+
+    def __init__(self, rate: float, capacity: float = 1) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def acquire(self) -> float:
+        """取一个令牌，必要时阻塞等待，返回等待的秒数"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                else:
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def block_for(self, seconds: float):
+        """在接下来的 seconds 秒内暂停发放令牌（例如服务端返回 Retry-After）"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class AdaptiveRateLimiter:
+    """
+    自适应限流器：遇到限流或服务端错误时降低速率并退避重试，
+    连续成功后逐步恢复到最大速率。
+    """
+
+    def __init__(
+        self,
+        max_rate: float,
+        min_rate: float = 0.2,
+        max_retries: int = 5,
+        is_throttled: Callable[[Exception], bool] = None,
+        get_retry_after: Callable[[Exception], Optional[float]] = None,
+    ) -> None:
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.max_retries = max_retries
+        self.is_throttled = is_throttled or (lambda e: False)
+        self.get_retry_after = get_retry_after or (lambda e: None)
+        self.bucket = TokenBucket(rate=max_rate, capacity=max(1.0, max_rate))
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._throttles = 0
+        self._retries = 0
+        self._wait_time = 0.0
+
+    def _on_success(self):
+        with self._lock:
+            self._calls += 1
+            # 加性恢复
+            self.bucket.rate = min(self.max_rate, self.bucket.rate + 0.1)
+
+    def _on_throttle(self, retry_after: Optional[float], attempt: int):
+        with self._lock:
+            self._throttles += 1
+            # 乘性降速
+            self.bucket.rate = max(self.min_rate, self.bucket.rate / 2)
+        delay = retry_after if retry_after is not None else min(60, 2**attempt)
+        self.bucket.block_for(delay)
+
+    def call(self, func: Callable, *args, **kwargs):
+        """在限流下调用 func，被限流时按 Retry-After 或指数退避重试"""
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire()
+            with self._lock:
+                self._wait_time += waited
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if not self.is_throttled(e) or attempt >= self.max_retries:
+                    with self._lock:
+                        self._calls += 1
+                    raise
+                self._on_throttle(self.get_retry_after(e), attempt)
+                with self._lock:
+                    self._retries += 1
+                attempt += 1
+                continue
+            self._on_success()
+            return result
+
+    def stats(self) -> Dict[str, float]:
+        """调用次数、被限流次数、重试次数、累计等待时间和当前速率"""
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "throttles": self._throttles,
+                "retries": self._retries,
+                "wait_time": round(self._wait_time, 3),
+                "rate": round(self.bucket.rate, 3),
+            }
@@ -1,36 +1,245 @@
-from typing import List
-
-import feedparser
-import requests
-
-from app.log import logger
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Mapping, Optional
+
+from app import content_processor, feed_cache, http_client, metrics, scheduler, sinks
+from app.content_processor import ProcessedContent
+from app.feed_parser import StreamingFeedParser
+from app.log import logger, logging
 from app.model.article import Article
 from app.model.rss_item import RSSItem
-from app.notion_manager import (
-    check_articles_existence_in_notion,
-    save_article_to_notion,
-    update_rss_status,
-)
-from app.send_message import send_message_to_wechat
+from app.notifier import digest
+from app.notion_writer import writer
 from app.utils import parse_date
+from config import config
 
+if TYPE_CHECKING:
+    import aiohttp
 
-def get_entry_content(entry):
-    """根据RSS条目的不同情况尝试获取内容"""
-    if "content" in entry and entry["content"]:
-        return entry["content"][0].get("value")
-    if "summary" in entry:
-        return entry["summary"]
-    return entry.get("description")
+# 每个RSS源只处理最新的文章数量
+MAX_ENTRIES = 20
 
 
-def fetch_rss_content(rss_info: RSSItem):
+@dataclass
+class FeedResponse:
+    """RSS源下载结果，与具体使用的HTTP客户端无关"""
+
+    status: int
+    headers: Mapping[str, str]
+    parser: Optional[StreamingFeedParser] = None
+
+
+def build_request_headers(rss_url: str) -> dict:
+    """构造抓取请求头，带上缓存的 ETag / Last-Modified 做条件请求"""
+    return feed_cache.get_conditional_headers(rss_url)
+
+
+def download_feed(rss_url: str, feed: str = "") -> FeedResponse:
+    """同步下载RSS源内容，边下载边解析，取满条目后提前结束下载"""
+    deadline = time.monotonic() + config.FETCH_DEADLINE
+    with metrics.timer(
+        metrics.STAGE_FETCH, feed, metrics.host_of(rss_url)
+    ) as timing, http_client.get(
+        rss_url, headers=build_request_headers(rss_url), stream=True
+    ) as response:
+        if response.status_code == 304:
+            return FeedResponse(status=304, headers=response.headers)
+
+        response.raise_for_status()  # 如果状态码不是200，抛出HTTPError
+
+        parser = StreamingFeedParser(max_entries=MAX_ENTRIES)
+        try:
+            for chunk in http_client.iter_limited(
+                response, config.FETCH_MAX_BYTES, deadline
+            ):
+                if parser.feed(chunk):
+                    break
+        finally:
+            # 边下载边解析的耗时计入解析阶段
+            timing.adjust = -parser.seconds
+        return FeedResponse(
+            status=response.status_code, headers=response.headers, parser=parser
+        )
+
+
+async def download_feed_async(
+    session: "aiohttp.ClientSession", rss_url: str, feed: str = ""
+) -> FeedResponse:
+    """异步下载RSS源内容，边下载边解析，取满条目后提前结束下载"""
+    async with http_client.host_limit(session, rss_url):
+        return await _download_feed_async(session, rss_url, feed)
+
+
+async def _download_feed_async(
+    session: "aiohttp.ClientSession", rss_url: str, feed: str
+) -> FeedResponse:
+    with metrics.timer(metrics.STAGE_FETCH, feed, metrics.host_of(rss_url)) as timing:
+        async with session.get(
+            rss_url, headers=build_request_headers(rss_url)
+        ) as response:
+            if response.status == 304:
+                return FeedResponse(status=304, headers=response.headers)
+
+            response.raise_for_status()
+
+            parser = StreamingFeedParser(max_entries=MAX_ENTRIES)
+            try:
+                async for chunk in http_client.aiter_limited(
+                    response, config.FETCH_MAX_BYTES
+                ):
+                    if parser.feed(chunk):
+                        break
+            finally:
+                # 边下载边解析的耗时计入解析阶段
+                timing.adjust = -parser.seconds
+            return FeedResponse(
+                status=response.status, headers=response.headers, parser=parser
+            )
+
+
+def handle_feed_response(rss_info: RSSItem, response: FeedResponse) -> List[Article]:
+    """
+    解析已下载的RSS内容，查重并更新RSS数据库状态。
+
+    Args:
+        rss_info (RSSItem): 包含RSS源信息的对象。
+        response (FeedResponse): RSS源的下载结果。
+
+    Returns:
+        list: 新文章列表。如果源未修改或与数据库中的更新时间相同，则返回空列表。
+    """
     rss_id = rss_info.id
     rss_title = rss_info.title
     rss_url = rss_info.link
     rss_tags = rss_info.tags
     rss_updated = rss_info.updated
+    labels = metrics.feed_labels(rss_info)
+
+    # 304 表示源内容未变化，不需要解析
+    if response.status == 304:
+        logger.debug(f"RSS源 {rss_url} 未修改(304)，跳过处理。")
+        feed_cache.save_validator(rss_url, response.status, response.headers)
+        scheduler.record_fetch(rss_id, success=True)
+        return []
+
+    # 下载时已增量解析，这里取出结果（快速解析失败时回退到 feedparser）
+    parser = response.parser
+    try:
+        feed = parser.close()
+    except Exception:
+        metrics.observe(metrics.STAGE_PARSE, parser.seconds, ok=False, **labels)
+        raise
+    metrics.observe(metrics.STAGE_PARSE, parser.seconds, **labels)
+    feed_updated = feed.updated
+
+    # 转换 feed_updated 为 ISO 格式
+    parsed_feed_updated = parse_date(feed_updated)
+
+    # 记录条目的发布时间，用于计算下次抓取时间
+    scheduler.record_fetch(
+        rss_id,
+        published=[
+            parse_date(entry.published) for entry in feed.entries if entry.published
+        ],
+        success=True,
+    )
+
+    # 构建文章列表
+    articles = []
+
+    # 比较 feed_updated 和数据库中的 rss_updated，如果相同，跳过文章处理
+    if (
+        parsed_feed_updated
+        and rss_updated
+        and parsed_feed_updated == parse_date(rss_updated)
+    ):
+        logger.debug(f"RSS源 {rss_url} 没有新文章，跳过处理。")
+        feed_cache.save_validator(rss_url, response.status, response.headers)
+        return articles
+
+    # 收集文章链接，由当前的文章存储批量查重
+    article_links = [entry.link for entry in feed.entries]
+    with metrics.timer(metrics.STAGE_DEDUP, **labels):
+        existing_links = sinks.filter_existing(article_links)
+
+    new_entries = []
+    for entry in feed.entries:
+        if entry.link in existing_links:
+            logger.debug(f"文章已存在，跳过: {entry.link}")
+            continue  # 如果文章已存在，则跳过
+        new_entries.append(entry)
+
+    # 一个源的新文章正文一起转换
+    contents = convert_contents([entry.content or "" for entry in new_entries], labels)
+
+    for entry, processed in zip(new_entries, contents):
+        # 创建 Article 实例
+        article = Article(
+            title=entry.title,
+            link=entry.link,
+            date=parse_date(entry.published),
+            source_id=rss_id,
+            tags=rss_tags,
+            content=processed.markdown,
+            summary=processed.summary,
+        )
+
+        articles.append(article)
+
+    # 正常时，更新RSS数据库状态为活跃
+    logger.info(f"抓取正常，更新rss状态: {rss_title}")
+    writer.submit_status(
+        rss_id=rss_id,
+        status="活跃",
+        updated_time=parsed_feed_updated,  # 使用RSS中的更新时间
+        remarks=None,  # 正常情况下不需要备注
+        labels=labels,
+    )
+    if parsed_feed_updated:
+        # 常驻模式下RSS源列表在多轮之间复用，同步记下提交的更新时间，下一轮没有新文章时直接跳过
+        rss_info.updated = parsed_feed_updated
+    feed_cache.save_validator(rss_url, response.status, response.headers)
+    return articles
+
+
+def convert_contents(
+    htmls: List[str], labels: Mapping[str, str]
+) -> List[ProcessedContent]:
+    """正文转换为Markdown和纯文本摘要，转换失败或超时时保留原始内容"""
+    if not htmls:
+        return []
+    try:
+        with metrics.timer(metrics.STAGE_CONVERT, **labels):
+            return content_processor.process_many(htmls)
+    except Exception as e:
+        logger.error(f"转换文章内容失败: {e!r}")
+        return [
+            ProcessedContent(markdown=html, summary=content_processor.summarize(html))
+            for html in htmls
+        ]
 
+
+def mark_feed_error(rss_info: RSSItem, remarks: str):
+    """
+    更新RSS数据库的状态为"错误"，当前时间作为更新时间。
+
+    同时清除条件请求的校验信息：否则下次抓取得到 304，不会解析内容，状态会一直停留在"错误"。
+    """
+    scheduler.record_fetch(rss_info.id, success=False)
+    feed_cache.clear_validator(rss_info.link)
+    updated_time = parse_date(None)
+    writer.submit_status(
+        rss_id=rss_info.id,
+        status="错误",
+        updated_time=updated_time,
+        remarks=remarks,
+        labels=metrics.feed_labels(rss_info),
+    )
+    rss_info.updated = updated_time
+
+
+def fetch_rss_content(rss_info: RSSItem):
     """
     抓取RSS源内容并处理。若遇到错误，更新RSS数据库的状态为"错误"。
 
@@ -40,99 +249,84 @@ def fetch_rss_content(rss_info: RSSItem):
     Returns:
         list: 成功抓取的文章列表。如果feed与数据库中的更新时间相同，则返回空列表。
     """
+    import requests
+
     try:
-        # 抓取RSS源内容
-        response = requests.get(
-            rss_url, headers={"User-Agent": "Mozilla/5.0"}, timeout=120
-        )
-        response.raise_for_status()  # 如果状态码不是200，抛出HTTPError
+        response = download_feed(rss_info.link, rss_info.title)
+        return handle_feed_response(rss_info, response)
 
-        feed = feedparser.parse(response.text)
-
-        if feed.bozo:  # 检查是否有解析错误
-            raise Exception(f"RSS解析错误: {feed.bozo_exception}")
-
-        # 记录RSS中的更新时间，优先使用`updated`，如果没有则使用`published`
-        feed_updated = feed.feed.get("updated", None)
-        if not feed_updated:
-            feed_updated = feed.feed.get("published", None)
-
-        # 转换 feed_updated 为 ISO 格式
-        parsed_feed_updated = parse_date(feed_updated)
-
-        # logger.debug(
-        #     f"parsed_feed_updated:{parsed_feed_updated},  rss_updated:{parse_date(rss_updated)}, feed_updated:{feed_updated}"
-        # )
-
-        # 构建文章列表
-        articles = []
-
-        # 比较 feed_updated 和数据库中的 rss_updated，如果相同，跳过文章处理
-        if (
-            parsed_feed_updated
-            and rss_updated
-            and parsed_feed_updated == parse_date(rss_updated)
-        ):
-            logger.debug(f"RSS源 {rss_url} 没有新文章，跳过处理。")
-            return articles
-
-        # 只处理前20篇文章
-        feed.entries = feed.entries[:20]
-
-        # 收集文章链接，批量查询
-        article_links = [entry.link for entry in feed.entries]
-        existing_links = check_articles_existence_in_notion(article_links)
-
-        for entry in feed.entries:
-            if entry.link in existing_links:
-                logger.debug(f"文章已存在，跳过: {entry.link}")
-                continue  # 如果文章已存在，则跳过
-
-            # 创建 Article 实例
-            article = Article(
-                title=entry.title,
-                link=entry.link,
-                date=parse_date(entry.get("published")),
-                source_id=rss_id,
-                tags=rss_tags,
-                content=get_entry_content(entry),
-            )
+    except (requests.exceptions.RequestException, http_client.ResponseLimitError) as e:
+        # 捕获网络请求错误
+        logger.error(f"网络请求错误: {e}")
+        mark_feed_error(rss_info, f"网络错误: {str(e)}")
+        return []
+
+    except Exception as e:
+        # 捕获解析或其他错误
+        logger.error(f"RSS解析或处理错误: {e}")
+        mark_feed_error(rss_info, f"解析错误: {str(e)}")
+        return []
 
-            articles.append(article)
 
-        # 正常时，更新RSS数据库状态为活跃
-        logger.info(f"抓取正常，更新rss状态: {rss_title}")
-        update_rss_status(
-            rss_id=rss_id,
-            status="活跃",
-            updated_time=parsed_feed_updated,  # 使用RSS中的更新时间
-            remarks=None,  # 正常情况下不需要备注
-        )
-        return articles
+async def fetch_rss_content_async(
+    session: "aiohttp.ClientSession", rss_info: RSSItem
+) -> List[Article]:
+    """
+    异步版本的 fetch_rss_content：下载在事件循环中完成，
+    解析和Notion调用等阻塞操作放到线程中执行。
+    """
+    import aiohttp
 
-    except requests.exceptions.RequestException as e:
+    try:
+        response = await download_feed_async(session, rss_info.link, rss_info.title)
+    except (
+        aiohttp.ClientError,
+        asyncio.TimeoutError,
+        http_client.ResponseLimitError,
+    ) as e:
         # 捕获网络请求错误
-        logger.error(f"网络请求错误: {e}")
-        update_rss_status(
-            rss_id=rss_id,
-            status="错误",
-            updated_time=parse_date(None),  # 当前时间作为更新时间
-            remarks=f"网络错误: {str(e)}",
-        )
+        logger.error(f"网络请求错误: {e!r}")
+        await asyncio.to_thread(mark_feed_error, rss_info, f"网络错误: {e!r}")
+        return []
+    except Exception as e:
+        # 下载时边下载边解析，解析过程中的错误也在这里
+        logger.error(f"RSS解析或处理错误: {e!r}")
+        await asyncio.to_thread(mark_feed_error, rss_info, f"解析错误: {e!r}")
         return []
 
+    try:
+        return await asyncio.to_thread(handle_feed_response, rss_info, response)
     except Exception as e:
         # 捕获解析或其他错误
         logger.error(f"RSS解析或处理错误: {e}")
-        update_rss_status(
-            rss_id=rss_id,
-            status="错误",
-            updated_time=parse_date(None),  # 当前时间作为更新时间
-            remarks=f"解析错误: {str(e)}",
-        )
+        await asyncio.to_thread(mark_feed_error, rss_info, f"解析错误: {str(e)}")
         return []
 
 
+def publish_articles(rss_feed: RSSItem, articles: List[Article]) -> List[str]:
+    """将新文章加入Notion写入队列，写入完成后加入运行结束时发送的汇总消息"""
+    if not articles:
+        logger.info(f"没有新的文章更新: {rss_feed.title}")
+        return []
+
+    # 日志级别低于 DEBUG 时不构造文章属性
+    debug = logger.isEnabledFor(logging.DEBUG)
+    for article in articles:
+        logger.info(f"文章加入写入队列: {article.title}")
+        if debug:
+            logger.debug(f"article: {article.to_notion_properties()}")
+
+    labels = metrics.feed_labels(rss_feed)
+
+    def notify(saved_articles: List[Article]):
+        # 写入成功的文章先加入汇总，运行结束时统一发送到企业微信群机器人
+        digest.add(rss_feed.title, saved_articles)
+
+    writer.submit_articles(articles, on_complete=notify, labels=labels)
+
+    return [f"{article.title}\n{article.link}\n" for article in articles]
+
+
 def process_rss_feed(rss_feed: RSSItem) -> List[str]:
     logger.info(f"开始处理: {rss_feed.title}")
 
@@ -140,23 +334,16 @@ def process_rss_feed(rss_feed: RSSItem) -> List[str]:
 
     logger.info(f"文章抓取完成，源: {rss_feed.title}")
 
-    rss_messages = []
+    return publish_articles(rss_feed, articles)
 
-    for article in articles:
-        logger.info(f"开始保存文章: {article.title}")
-        logger.debug(f"article: {article.to_notion_properties()}")
 
-        save_article_to_notion(article)
+async def process_rss_feed_async(
+    session: "aiohttp.ClientSession", rss_feed: RSSItem
+) -> List[str]:
+    logger.info(f"开始处理: {rss_feed.title}")
 
-        article_message = f"{article.title}\n{article.link}\n"
-        rss_messages.append(article_message)
+    articles = await fetch_rss_content_async(session, rss_feed)
 
-    if len(rss_messages) > 0:
-        rss_messages.append(f"@{rss_feed.title}")
-        final_message = "\n".join(rss_messages)
-        logger.info(f"发送消息到企业微信群机器人: {rss_feed.title}")
-        send_message_to_wechat(final_message)
-    else:
-        logger.info(f"没有新的文章更新: {rss_feed.title}")
+    logger.info(f"文章抓取完成，源: {rss_feed.title}")
 
-    return rss_messages
+    return await asyncio.to_thread(publish_articles, rss_feed, articles)
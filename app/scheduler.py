@@ -0,0 +1,147 @@
+import statistics
+import time
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+
+from app.local_store import get_connection, get_lock, register_schema
+from app.log import logger
+from app.model.rss_item import RSSItem
+from config import config
+
+# 参与计算发布间隔的最近发布时间数量
+HISTORY_SIZE = 20
+
+register_schema(
+    """
+    CREATE TABLE IF NOT EXISTS feed_schedule (
+        feed_id TEXT PRIMARY KEY,
+        last_fetched REAL,
+        next_due REAL,
+        interval REAL,
+        failures INTEGER DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS feed_publish_times (
+        feed_id TEXT,
+        published REAL,
+        PRIMARY KEY (feed_id, published)
+    )
+    """,
+)
+
+
+def _to_timestamp(date_str: str) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(date_str).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _clamp(seconds: float) -> float:
+    return max(
+        config.SCHEDULE_MIN_INTERVAL * 60,
+        min(config.SCHEDULE_MAX_INTERVAL * 60, seconds),
+    )
+
+
+def compute_interval(published_times: List[float]) -> float:
+    """
+    根据最近的发布时间计算抓取间隔（秒）：取相邻发布时间间隔的中位数的一半，
+    并限制在最小/最大间隔之间。发布记录不足时使用最小间隔。
+    """
+    times = sorted(published_times, reverse=True)
+    gaps = [a - b for a, b in zip(times, times[1:]) if a > b]
+    if not gaps:
+        return _clamp(0)
+    return _clamp(statistics.median(gaps) / 2)
+
+
+def is_due(feed_id: str, now: Optional[float] = None) -> bool:
+    """判断RSS源是否到了抓取时间，没有记录的源总是需要抓取"""
+    now = now or time.time()
+    with get_lock():
+        row = (
+            get_connection()
+            .execute("SELECT next_due FROM feed_schedule WHERE feed_id = ?", (feed_id,))
+            .fetchone()
+        )
+    if row is None or row[0] is None:
+        return True
+    # 留出容差，避免因定时任务的启动时间抖动而多等一个周期
+    return row[0] <= now + config.SCHEDULE_TOLERANCE * 60
+
+
+def record_fetch(
+    feed_id: str,
+    published: Iterable[Optional[str]] = (),
+    success: bool = True,
+    now: Optional[float] = None,
+):
+    """
+    记录一次抓取结果，并计算下次抓取时间。
+
+    Args:
+        feed_id: RSS源ID
+        published: 本次抓取到的条目发布时间（ISO 8601）
+        success: 抓取是否成功，失败时按失败次数指数退避
+    """
+    now = now or time.time()
+    timestamps = [ts for ts in map(_to_timestamp, published) if ts is not None]
+
+    with get_lock():
+        conn = get_connection()
+        if timestamps:
+            conn.executemany(
+                "INSERT OR IGNORE INTO feed_publish_times (feed_id, published) VALUES (?, ?)",
+                [(feed_id, ts) for ts in timestamps],
+            )
+            conn.execute(
+                """
+                DELETE FROM feed_publish_times WHERE feed_id = ? AND published NOT IN (
+                    SELECT published FROM feed_publish_times WHERE feed_id = ?
+                    ORDER BY published DESC LIMIT ?
+                )
+                """,
+                (feed_id, feed_id, HISTORY_SIZE),
+            )
+        history = [
+            row[0]
+            for row in conn.execute(
+                "SELECT published FROM feed_publish_times WHERE feed_id = ?",
+                (feed_id,),
+            )
+        ]
+        row = conn.execute(
+            "SELECT failures FROM feed_schedule WHERE feed_id = ?", (feed_id,)
+        ).fetchone()
+        failures = 0 if success else (row[0] if row else 0) + 1
+
+        if success:
+            interval = compute_interval(history)
+        else:
+            interval = _clamp(config.SCHEDULE_MIN_INTERVAL * 60 * 2 ** (failures - 1))
+
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO feed_schedule
+                (feed_id, last_fetched, next_due, interval, failures)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (feed_id, now, now + interval, interval, failures),
+        )
+
+
+def filter_due(
+    rss_feeds: Iterable[RSSItem], force_all: bool = False
+) -> Iterator[RSSItem]:
+    """只保留到了抓取时间的RSS源，force_all 时全部保留"""
+    skipped = 0
+    for rss_feed in rss_feeds:
+        if force_all or is_due(rss_feed.id):
+            yield rss_feed
+        else:
+            skipped += 1
+            logger.debug(f"未到抓取时间，跳过: {rss_feed.title}")
+    if skipped:
+        logger.info(f"共跳过 {skipped} 个未到抓取时间的RSS源")
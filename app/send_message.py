@@ -4,9 +4,7 @@ import hmac
 import json
 import time
 
-import requests
-from requests.exceptions import RequestException
-
+from app import http_client
 from app.log import logger
 from config import config
 
@@ -26,71 +24,87 @@ def generate_signature(secret: str, timestamp: str) -> str:
     return sign
 
 
-def send_message_to_feishu(content: str):
+class WebhookError(Exception):
+    """消息接口返回了非 0 的错误码"""
+
+    def __init__(self, errcode, errmsg) -> None:
+        super().__init__(f"{errcode}: {errmsg}")
+        self.errcode = errcode
+        self.errmsg = errmsg
+
+
+def _post_json(url: str, payload: dict) -> dict:
+    """通过共享连接池发送 JSON 请求，返回响应结果"""
+    response = http_client.post(
+        url,
+        headers={"Content-Type": "application/json"},
+        data=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def post_feishu_text(content: str):
     """
-    向飞书自定义机器人发送消息
+    向飞书自定义机器人发送一条文本消息，失败时抛出异常
     :param content: 消息内容
     """
-    # 当前时间戳（单位秒）
-    timestamp = str(int(time.time()))
+    payload = {"msg_type": "text", "content": {"text": content}}
 
     # 生成签名（如果设置了签名校验）
     if config.SECRET_KEY_FEISHU:
-        sign = generate_signature(config.SECRET_KEY_FEISHU, timestamp)
-        headers = {"Content-Type": "application/json"}
-        payload = {
-            "timestamp": timestamp,
-            "sign": sign,
-            "msg_type": "text",
-            "content": {"text": content},
-        }
-    else:
-        headers = {"Content-Type": "application/json"}
-        payload = {"msg_type": "text", "content": {"text": content}}
+        # 当前时间戳（单位秒）
+        timestamp = str(int(time.time()))
+        payload["timestamp"] = timestamp
+        payload["sign"] = generate_signature(config.SECRET_KEY_FEISHU, timestamp)
 
-    try:
-        response = requests.post(
-            config.WEBHOOK_URL_FEISHU, headers=headers, data=json.dumps(payload)
-        )
-        response.raise_for_status()
-
-        # 检查响应结果
-        result = response.json()
-        if result.get("code") == 0:
-            logger.info("消息发送成功")
-        else:
-            logger.error(f"消息发送失败: {result.get('msg')}")
+    result = _post_json(config.WEBHOOK_URL_FEISHU, payload)
+    if result.get("code") != 0:
+        raise WebhookError(result.get("code"), result.get("msg"))
 
-    except RequestException as e:
-        logger.error(f"请求发送失败: {e}")
-    except json.JSONDecodeError:
-        logger.error("响应结果解析错误")
 
-
-def send_message_to_wechat(content: str):
+def post_wechat_text(content: str):
     """
-    向企业微信群机器人发送消息
+    向企业微信群机器人发送一条文本消息，失败时抛出异常
     :param content: 消息内容
     """
-    headers = {"Content-Type": "application/json"}
-
-    # 组装请求数据
     payload = {"msgtype": "text", "text": {"content": content}}
 
+    result = _post_json(config.WEBHOOK_URL_WECHAT, payload)
+    if result.get("errcode") != 0:
+        raise WebhookError(result.get("errcode"), result.get("errmsg"))
+
+
+def _send_safely(post, content: str) -> bool:
+    from requests.exceptions import RequestException
+
     try:
-        response = requests.post(
-            config.WEBHOOK_URL_WECHAT, headers=headers, data=json.dumps(payload)
-        )
-        response.raise_for_status()
-
-        # 检查响应结果
-        result = response.json()
-        if result.get("errcode") == 0:
-            logger.info("消息发送成功")
-        else:
-            logger.error(f"消息发送失败: {result.get('errmsg')}")
+        post(content)
+        logger.info("消息发送成功")
+        return True
 
+    except WebhookError as e:
+        logger.error(f"消息发送失败: {e.errmsg}")
     except RequestException as e:
         logger.error(f"请求发送失败: {e}")
     except json.JSONDecodeError:
         logger.error("响应结果解析错误")
+    return False
+
+
+def send_message_to_feishu(content: str):
+    """
+    向飞书自定义机器人发送消息
+    :param content: 消息内容
+    :return: 是否发送成功
+    """
+    return _send_safely(post_feishu_text, content)
+
+
+def send_message_to_wechat(content: str):
+    """
+    向企业微信群机器人发送消息
+    :param content: 消息内容
+    :return: 是否发送成功
+    """
+    return _send_safely(post_wechat_text, content)
@@ -0,0 +1,243 @@
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import asdict
+from typing import Iterable, List, Optional, Set
+
+from app.log import logger
+from app.model.article import Article
+from config import config
+
+# IN 查询每批的链接数量，低于 SQLite 的参数个数上限
+_IN_BATCH = 500
+
+
+class ArticleSink(ABC):
+    """
+    文章的存储后端。
+
+    - filter_existing: 返回已经保存过的链接，用于查重
+    - write_many: 批量写入，返回写入成功的文章；单篇失败时记录日志并跳过，整批失败时抛出异常
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def filter_existing(self, links: List[str]) -> Set[str]:
+        """返回 links 中已经保存过的链接"""
+
+    @abstractmethod
+    def write_many(self, articles: List[Article]) -> List[Article]:
+        """批量写入文章，返回写入成功的文章"""
+
+    def close(self):
+        pass
+
+
+class NotionSink(ArticleSink):
+    """写入Notion文章库，Notion没有批量接口，逐篇创建页面"""
+
+    name = "notion"
+
+    def filter_existing(self, links: List[str]) -> Set[str]:
+        from app.notion_manager import find_existing_links
+
+        return find_existing_links(links)
+
+    def write_many(self, articles: List[Article]) -> List[Article]:
+        from app.notion_manager import save_article_to_notion
+
+        saved = []
+        for article in articles:
+            try:
+                save_article_to_notion(article)
+                saved.append(article)
+            except Exception as e:
+                logger.error(f"保存文章失败: {article.link}, {e}")
+        return saved
+
+
+class MongoSink(ArticleSink):
+    """写入MongoDB，查重用 $in，写入用无序的 insert_many"""
+
+    name = "mongo"
+
+    def filter_existing(self, links: List[str]) -> Set[str]:
+        from app import mongodb_manager
+
+        return mongodb_manager.find_existing_links(links)
+
+    def write_many(self, articles: List[Article]) -> List[Article]:
+        from app import mongodb_manager
+
+        mongodb_manager.insert_articles(articles)
+        return list(articles)
+
+
+class SQLiteSink(ArticleSink):
+    """
+    写入本地SQLite文件（WAL 模式），每次 write_many 在一个事务中批量写入，
+    不依赖任何外部服务，适合本地压测和大流量的源。
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            db_dir = os.path.dirname(self.path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    link TEXT PRIMARY KEY,
+                    title TEXT,
+                    content TEXT,
+                    summary TEXT,
+                    date TEXT,
+                    source_id TEXT,
+                    tags TEXT,
+                    article_type TEXT,
+                    status TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+                """)
+            self._connection = conn
+        return self._connection
+
+    def filter_existing(self, links: List[str]) -> Set[str]:
+        links = list(dict.fromkeys(links))
+        existing = set()
+        with self._lock:
+            conn = self._get_connection()
+            for i in range(0, len(links), _IN_BATCH):
+                batch = links[i : i + _IN_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT link FROM articles WHERE link IN ({placeholders})", batch
+                ).fetchall()
+                existing.update(row[0] for row in rows)
+        return existing
+
+    def write_many(self, articles: List[Article]) -> List[Article]:
+        rows = [
+            (
+                a.link,
+                a.title,
+                a.content,
+                a.summary,
+                a.date,
+                a.source_id,
+                json.dumps(a.tags or [], ensure_ascii=False),
+                a.article_type,
+                a.status,
+            )
+            for a in articles
+        ]
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    """
+                    INSERT OR IGNORE INTO articles
+                        (link, title, content, summary, date, source_id, tags, article_type, status)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return list(articles)
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class JsonlSink(ArticleSink):
+    """追加写入JSON Lines文件，每行一篇文章"""
+
+    name = "jsonl"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._links: Optional[Set[str]] = None
+
+    def _load_links(self) -> Set[str]:
+        if self._links is None:
+            self._links = set()
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            self._links.add(json.loads(line)["link"])
+        return self._links
+
+    def filter_existing(self, links: List[str]) -> Set[str]:
+        with self._lock:
+            seen = self._load_links()
+            return {link for link in links if link in seen}
+
+    def write_many(self, articles: List[Article]) -> List[Article]:
+        with self._lock:
+            seen = self._load_links()
+            new_articles = [a for a in articles if a.link not in seen]
+            db_dir = os.path.dirname(self.path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(
+                    "".join(
+                        json.dumps(asdict(a), ensure_ascii=False) + "\n"
+                        for a in new_articles
+                    )
+                )
+            seen.update(a.link for a in new_articles)
+        return list(articles)
+
+
+def create_sink(name: str) -> ArticleSink:
+    if name == "notion":
+        return NotionSink()
+    if name == "mongo":
+        return MongoSink()
+    if name == "sqlite":
+        return SQLiteSink(config.SINK_SQLITE_PATH)
+    if name == "jsonl":
+        return JsonlSink(config.SINK_JSONL_PATH)
+    raise ValueError(f"未知的文章存储: {name}，可选 notion、mongo、sqlite、jsonl")
+
+
+_sink: Optional[ArticleSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_sink() -> ArticleSink:
+    """按配置 ARTICLE_SINK 创建进程内共用的存储后端"""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = create_sink(config.ARTICLE_SINK)
+    return _sink
+
+
+def filter_existing(links: Iterable[str]) -> Set[str]:
+    return get_sink().filter_existing(list(links))
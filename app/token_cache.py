@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Tuple
+
+from app.local_store import get_connection, get_lock, register_schema
+from app.log import logger
+from config import config
+
+try:
+    import fcntl
+except ImportError:  # Windows 上只做进程内的互斥
+    fcntl = None
+
+# 距离过期不足这么多秒时在后台提前刷新（秒）
+REFRESH_AHEAD = 300
+# 服务端给出的有效期再扣掉这么多秒，避免边界上用到刚过期的 token
+EXPIRY_MARGIN = 60
+
+register_schema(
+    """
+    CREATE TABLE IF NOT EXISTS access_tokens (
+        key TEXT PRIMARY KEY,
+        token TEXT NOT NULL,
+        expires_at REAL NOT NULL,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+)
+
+
+def _load(key: str) -> Optional[Tuple[str, float]]:
+    with get_lock():
+        row = (
+            get_connection()
+            .execute(
+                "SELECT token, expires_at FROM access_tokens WHERE key = ?", (key,)
+            )
+            .fetchone()
+        )
+    return (row[0], row[1]) if row else None
+
+
+def _save(key: str, token: str, expires_at: float):
+    with get_lock():
+        get_connection().execute(
+            """
+            INSERT INTO access_tokens (key, token, expires_at, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(key) DO UPDATE SET
+                token = excluded.token,
+                expires_at = excluded.expires_at,
+                updated_at = CURRENT_TIMESTAMP
+            """,
+            (key, token, expires_at),
+        )
+
+
+def _delete(key: str, token: str):
+    with get_lock():
+        get_connection().execute(
+            "DELETE FROM access_tokens WHERE key = ? AND token = ?", (key, token)
+        )
+
+
+@contextmanager
+def _file_lock(key: str):
+    """跨进程互斥：同一时间只有一个进程去请求新的 token"""
+    if fcntl is None:
+        yield
+        return
+    lock_dir = os.path.dirname(config.LOCAL_DB_PATH) or "."
+    os.makedirs(lock_dir, exist_ok=True)
+    safe_key = "".join(c if c.isalnum() else "_" for c in key)
+    with open(os.path.join(lock_dir, f".{safe_key}.lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class TokenCache:
+    """
+    持久化的 access token 缓存：token 保存在本地数据库中，进程重启后继续使用；
+    同一时间只有一个线程（跨进程通过文件锁）请求新 token，其余调用方等待并复用它的结果；
+    临近过期时在后台提前刷新，调用方不需要等待。
+
+    fetch 返回 (token, 有效期秒数)。
+    """
+
+    def __init__(self, key: str, fetch: Callable[[], Tuple[str, float]]) -> None:
+        self.key = key
+        self._fetch = fetch
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._background: Optional[threading.Thread] = None
+
+    def _valid(self, now: float) -> bool:
+        return self._token is not None and now < self._expires_at
+
+    def _load_persisted(self):
+        stored = _load(self.key)
+        if stored and stored[1] > self._expires_at:
+            self._token, self._expires_at = stored
+
+    def _refresh(self, force: bool = False) -> str:
+        """请求新 token；拿到锁后先确认别的线程或进程是否已经刷新过"""
+        with self._refresh_lock, _file_lock(self.key):
+            self._load_persisted()
+            now = time.time()
+            if self._valid(now) and not (
+                force and self._expires_at - now < REFRESH_AHEAD
+            ):
+                return self._token
+
+            token, expires_in = self._fetch()
+            expires_at = time.time() + float(expires_in) - EXPIRY_MARGIN
+            _save(self.key, token, expires_at)
+            self._token, self._expires_at = token, expires_at
+            logger.info(f"已刷新 access token: {self.key}")
+            return token
+
+    def _refresh_in_background(self):
+        if self._background is not None and self._background.is_alive():
+            return
+
+        def run():
+            try:
+                self._refresh(force=True)
+            except Exception as e:
+                # 旧 token 仍然有效，下次调用时再试
+                logger.error(f"后台刷新 access token 失败: {e}")
+
+        self._background = threading.Thread(
+            target=run, name=f"token-refresh-{self.key}", daemon=True
+        )
+        self._background.start()
+
+    def get(self) -> str:
+        now = time.time()
+        if not self._valid(now):
+            self._load_persisted()
+        if not self._valid(now):
+            return self._refresh()
+        if self._expires_at - now < REFRESH_AHEAD:
+            self._refresh_in_background()
+        return self._token
+
+    def invalidate(self, token: Optional[str] = None):
+        """接口返回 token 无效时调用；只在缓存的仍是这个 token 时才清除，避免清掉刚刷新的"""
+        token = token or self._token
+        if token is None:
+            return
+        with self._refresh_lock:
+            if self._token == token:
+                self._token, self._expires_at = None, 0.0
+            _delete(self.key, token)
+
+
+_caches: Dict[str, TokenCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(key: str, fetch: Callable[[], Tuple[str, float]]) -> TokenCache:
+    """同一个 key 在进程内共用一个缓存"""
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = TokenCache(key, fetch)
+        return cache
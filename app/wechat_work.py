@@ -1,25 +1,23 @@
-import datetime
+import hashlib
 from pathlib import Path
-from typing import List
-
-import requests
-from requests_toolbelt import MultipartEncoder
+from typing import List, Tuple
 
+from app import http_client, media_cache, token_cache
 from app.log import logger
 
 UPLOAD_URL = "https://qyapi.weixin.qq.com/cgi-bin/media/upload"
 SEND_URL = "https://qyapi.weixin.qq.com/cgi-bin/message/send"
 TOKEN_URL = "https://qyapi.weixin.qq.com/cgi-bin/gettoken"
 
+# 不合法的 media_id（素材已过期或被删除）
+ERRCODE_INVALID_MEDIA_ID = 40007
+
 
 class WechatWork:
     """
     企业微信消息推送
     """
 
-    access_token: str = None
-    access_token_expires_time: int = None
-
     def __init__(self, corpid: str, appid: str, corpsecret: str) -> None:
         """
         初始化消息通知应用
@@ -36,11 +34,28 @@ class WechatWork:
         self.corpid = corpid
         self.appid = appid
         self.corpsecret = corpsecret
-        self.access_token = self.get_access_token()
+        # token 在第一次发送时才获取，同一个应用在进程间共用持久化的缓存
+        secret_hash = hashlib.sha256(corpsecret.encode("utf-8")).hexdigest()[:16]
+        self._token_cache = token_cache.get_cache(
+            f"wechat_work:{corpid}:{secret_hash}", self._request_access_token
+        )
+
+    def _media_cache_key(self, filepath: str, filename: str, media_type: str) -> str:
+        # media_id 只在同一个企业应用内有效，文件名会展示给接收人，都要计入缓存键
+        return ":".join(
+            [
+                self._token_cache.key,
+                media_type,
+                filename,
+                media_cache.file_sha256(filepath),
+            ]
+        )
 
-    def upload_file(self, filepath: str, filename: str) -> str:
+    def upload_file(
+        self, filepath: str, filename: str, media_type: str = "file"
+    ) -> str:
         """
-        上传文件
+        上传文件，内容相同的文件在素材有效期内直接复用上次的 media_id
 
         Parameters
         ----------
@@ -48,18 +63,29 @@ class WechatWork:
             本地文件路径
         filename : str
             云端存储的文件名
+        media_type : str, optional
+            素材类型 ``'image'``、``'voice'``、``'video'`` 或 ``'file'``，默认为 ``'file'``
 
         Returns
         -------
         str
             上传的文件的 ID
         """
+        cache_key = self._media_cache_key(filepath, filename, media_type)
+        media_id = media_cache.get(cache_key)
+        if media_id:
+            logger.debug(f"复用已上传的素材: {filename}")
+            return media_id
+
+        from requests_toolbelt import MultipartEncoder
+
         access_token = self.get_access_token()
-        params = {"access_token": access_token, "type": "file"}
+        params = {"access_token": access_token, "type": media_type}
         with open(filepath, "rb") as f:
+            # MultipartEncoder 边读文件边发送
             m = MultipartEncoder(fields={"file": (filename, f, "multipart/form-data")})
 
-            response = requests.post(
+            response = http_client.post(
                 url=UPLOAD_URL,
                 params=params,
                 data=m,
@@ -68,11 +94,43 @@ class WechatWork:
             js = response.json()
             if js["errmsg"] != "ok":
                 return ""
+            media_cache.save(cache_key, js["media_id"], js.get("created_at"))
             return js["media_id"]
 
+    def _send_media(
+        self, msg_type: str, filepath: str, users: List[str], media_type: str
+    ) -> bool:
+        """上传（或复用）素材后发送，缓存的 media_id 失效时重新上传一次"""
+        filename = Path(filepath).name
+        media_id = self.upload_file(filepath, filename, media_type)
+        result = self.send_message(msg_type, users, media_id=media_id)
+        if result.get("errcode") == ERRCODE_INVALID_MEDIA_ID:
+            media_cache.delete(self._media_cache_key(filepath, filename, media_type))
+            media_id = self.upload_file(filepath, filename, media_type)
+            result = self.send_message(msg_type, users, media_id=media_id)
+        return result.get("errmsg") == "ok"
+
     def send(
         self, msg_type: str, users: List[str], content: str = None, media_id: str = None
     ) -> bool:
+        """
+        发送消息，参数同 send_message
+
+        Returns
+        -------
+        bool
+            是否发送成功
+        """
+        return self.send_message(msg_type, users, content, media_id)["errmsg"] == "ok"
+
+    def send_message(
+        self,
+        msg_type: str,
+        users: List[str],
+        content: str = None,
+        media_id: str = None,
+        access_token: str = None,
+    ) -> dict:
         """
         发送消息
 
@@ -94,14 +152,16 @@ class WechatWork:
             消息内容, 默认为 ``None``
         media_id : str, optional
             文件 ID, 默认为 ``None``
+        access_token : str, optional
+            使用的 token，默认为 ``None`` 时从缓存获取
 
         Returns
         -------
-        bool
-            是否发送成功
+        dict
+            接口返回结果，errcode 为 0 时发送成功
         """
         userid_str = "|".join(users)
-        access_token = self.get_access_token()
+        access_token = access_token or self.get_access_token()
         data = {
             "touser": userid_str,
             "msgtype": msg_type,
@@ -114,17 +174,17 @@ class WechatWork:
         }
 
         params = {"access_token": access_token}
-        logger.debug(f"access_token:{access_token}")
 
-        response = requests.post(SEND_URL, params=params, json=data)
+        response = http_client.post(SEND_URL, params=params, json=data)
+        result = response.json()
 
-        logger.debug(f"response:{response.json()}")
+        logger.debug(f"response:{result}")
 
-        return response.json()["errmsg"] == "ok"
+        return result
 
     def get_access_token(self) -> str:
         """
-        获取企业微信应用 token
+        获取企业微信应用 token，优先使用缓存，临近过期时在后台刷新
 
         Returns
         -------
@@ -137,24 +197,21 @@ class WechatWork:
             当无法获取 token 时
 
         """
-        if (
-            self.access_token_expires_time
-            and self.access_token
-            and datetime.datetime.now() < self.access_token_expires_time
-        ):
-            return self.access_token
+        return self._token_cache.get()
 
+    def invalidate_access_token(self, access_token: str = None):
+        """接口返回 token 无效或过期时调用，下次发送前重新获取"""
+        self._token_cache.invalidate(access_token)
+
+    def _request_access_token(self) -> Tuple[str, float]:
+        """请求新的 token，返回 token 和有效期（秒）"""
         params = {"corpid": self.corpid, "corpsecret": self.corpsecret}
-        response = requests.get(TOKEN_URL, params=params)
+        response = http_client.get(TOKEN_URL, params=params)
         js: dict = response.json()
         access_token = js.get("access_token")
         if access_token is None:
             raise Exception("获取 token 失败 请确保相关信息填写的正确性")
-        self.access_token = access_token
-        self.access_token_expires_time = datetime.datetime.now() + datetime.timedelta(
-            seconds=js.get("expires_in") - 60
-        )
-        return access_token
+        return access_token, js.get("expires_in", 7200)
 
     def send_image(self, image_path: str, users: List[str]) -> bool:
         """
@@ -167,8 +224,7 @@ class WechatWork:
         users : List[str]
             接受消息的的用户账号列表
         """
-        media_id = self.upload_file(image_path, Path(image_path).name)
-        return self.send(msg_type="image", users=users, media_id=media_id)
+        return self._send_media("image", image_path, users, media_type="image")
 
     def send_file(self, file_path: str, users: List[str]) -> bool:
         """
@@ -181,8 +237,7 @@ class WechatWork:
         users : List[str]
             接受消息的用户账号列表
         """
-        media_id = self.upload_file(file_path, Path(file_path).name)
-        return self.send(msg_type="file", users=users, media_id=media_id)
+        return self._send_media("file", file_path, users, media_type="file")
 
     def send_text(self, content: str, users: List[str]) -> bool:
         """
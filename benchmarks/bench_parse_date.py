@@ -0,0 +1,57 @@
+"""
+parse_date 微基准：对比原始的 dateutil 实现与 app.dates 的快速路径 + 缓存。
+
+运行: python -m benchmarks.bench_parse_date
+"""
+
+import timeit
+
+import pytz
+from dateutil import parser
+
+from app.dates import _parse_cached, parse_date
+
+SAMPLES = [
+    "Mon, 07 Oct 2024 10:00:00 GMT",
+    "Tue, 08 Oct 2024 18:30:15 +0800",
+    "2024-10-07T10:00:00Z",
+    "2024-10-07T10:00:00.123+08:00",
+    "2024-10-07",
+    "October 7, 2024 10:00 AM",
+]
+
+
+def parse_date_dateutil(date_str, strip_seconds=True):
+    """优化前的实现"""
+    parsed_date = parser.parse(date_str)
+    if parsed_date.tzinfo is None:
+        parsed_date = pytz.utc.localize(parsed_date)
+    if strip_seconds:
+        parsed_date = parsed_date.replace(second=0, microsecond=0)
+    beijing_timezone = pytz.timezone("Asia/Shanghai")
+    return parsed_date.astimezone(beijing_timezone).isoformat(timespec="seconds")
+
+
+def uncached(date_str):
+    return _parse_cached.__wrapped__(date_str, True)
+
+
+def main(number=2000):
+    for sample in SAMPLES:
+        assert parse_date(sample) == parse_date_dateutil(sample), sample
+
+    print(f"{'实现':<16}{'每次调用(us)':>14}")
+    for name, func in [
+        ("dateutil", parse_date_dateutil),
+        ("fast-path", uncached),
+        ("fast+cache", parse_date),
+    ]:
+        seconds = timeit.timeit(
+            lambda: [func(sample) for sample in SAMPLES], number=number
+        )
+        per_call = seconds / (number * len(SAMPLES)) * 1e6
+        print(f"{name:<16}{per_call:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+启动耗时检查：用 `python -X importtime` 导入 manage，超过预算或在导入时加载了
+重量级依赖时以非零状态退出。
+
+运行: python -m benchmarks.check_import_time [--budget-ms 250] [--runs 3]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# 这些依赖只应在第一次使用时才导入
+LAZY_MODULES = [
+    "aiohttp",
+    "requests",
+    "feedparser",
+    "notion_client",
+    "pymongo",
+    "openai",
+    "dateutil",
+    "requests_toolbelt",
+]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str):
+    """返回 (导入 module 的累计耗时毫秒, 导入过的模块名集合)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # 表头
+        imported.add(name.strip())
+        if name.strip() == module and name[1] != " ":
+            total_us = int(cumulative)
+    if total_us is None:
+        raise RuntimeError(f"没有找到 {module} 的导入耗时")
+    return total_us / 1000, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="manage")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.getenv("IMPORT_TIME_BUDGET_MS", "250")),
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    timings = []
+    imported = set()
+    for _ in range(args.runs):
+        elapsed, imported = measure(args.module)
+        timings.append(elapsed)
+    median = statistics.median(timings)
+    print(f"import {args.module}: {median:.1f} ms (预算 {args.budget_ms:.0f} ms)")
+
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in imported]
+    if eager:
+        print(f"启动时导入了应延迟加载的依赖: {', '.join(eager)}")
+        failed = True
+    if median > args.budget_ms:
+        print("启动耗时超过预算")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
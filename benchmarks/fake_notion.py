@@ -0,0 +1,239 @@
+"""
+本地模拟的 Notion API（以及企业微信群机器人 webhook），用于压测。
+
+支持的接口：
+- POST  /v1/databases/{id}/query  RSS库/文章库查询，支持分页、link 过滤、last_edited_time 过滤
+- POST  /v1/pages                 创建文章
+- PATCH /v1/pages/{id}            更新RSS源状态
+- POST  /webhook                  模拟企业微信群机器人
+
+可配置固定延迟和按比例注入的 429 响应。
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+RSS_DB_ID = "rss-db"
+READER_DB_ID = "reader-db"
+
+_QUERY_RE = re.compile(r"^/v1/databases/([^/]+)/query$")
+_PAGE_RE = re.compile(r"^/v1/pages/([^/]+)$")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class FakeNotion:
+    def __init__(
+        self,
+        feed_urls: List[str],
+        latency: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 0.5,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = Counter()
+        self.feeds = [
+            {
+                "object": "page",
+                "id": f"feed-{i}",
+                "last_edited_time": _now(),
+                "properties": {
+                    "name": {"title": [{"plain_text": f"Feed {i}"}]},
+                    "url": {"url": url},
+                    "AiSummaryEnabled": {"checkbox": False},
+                    "tags": {"multi_select": [{"name": "bench"}]},
+                    "updated": {"date": None},
+                },
+            }
+            for i, url in enumerate(feed_urls)
+        ]
+        self.pages = []
+        self.pages_by_link = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    # --- 数据处理 ---
+
+    def _paginate(self, items, body):
+        page_size = min(int(body.get("page_size") or 100), 100)
+        start = int(body.get("start_cursor") or 0)
+        chunk = items[start : start + page_size]
+        has_more = start + page_size < len(items)
+        return {
+            "object": "list",
+            "results": chunk,
+            "has_more": has_more,
+            "next_cursor": str(start + page_size) if has_more else None,
+        }
+
+    def query(self, database_id, body):
+        if database_id == RSS_DB_ID:
+            return self._paginate(self.feeds, body)
+
+        filter_ = body.get("filter") or {}
+        with self._lock:
+            if "or" in filter_:
+                links = [f["url"]["equals"] for f in filter_["or"]]
+                results = [
+                    self.pages_by_link[link]
+                    for link in links
+                    if link in self.pages_by_link
+                ]
+                return {
+                    "object": "list",
+                    "results": results,
+                    "has_more": False,
+                    "next_cursor": None,
+                }
+            pages = list(self.pages)
+        if filter_.get("timestamp") == "last_edited_time":
+            after = filter_["last_edited_time"]["on_or_after"]
+            pages = [p for p in pages if p["last_edited_time"] >= after]
+        return self._paginate(pages, body)
+
+    def create_page(self, body):
+        properties = body["properties"]
+        title = properties["title"]["title"][0]["text"]["content"]
+        page = {
+            "object": "page",
+            "id": str(uuid.uuid4()),
+            "last_edited_time": _now(),
+            "properties": {
+                "title": {"title": [{"plain_text": title}]},
+                "link": {"url": properties["link"]["url"]},
+                "source": properties.get("source") or {"relation": []},
+                "date": properties.get("date") or {"date": None},
+            },
+        }
+        with self._lock:
+            self.pages.append(page)
+            self.pages_by_link[page["properties"]["link"]["url"]] = page
+        return page
+
+    def update_page(self, page_id, body):
+        with self._lock:
+            for feed in self.feeds:
+                if feed["id"] == page_id:
+                    updated = body["properties"].get("updated")
+                    if updated:
+                        feed["properties"]["updated"] = updated
+                    return feed
+        return {"object": "page", "id": page_id}
+
+    # --- HTTP 服务 ---
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def _handle(self, method):
+                body = self._body()
+                path = self.path.split("?")[0]
+
+                if path == "/webhook":
+                    with fake._lock:
+                        fake.calls["webhook"] += 1
+                    self._send(200, {"errcode": 0, "errmsg": "ok"})
+                    return
+
+                if fake.latency:
+                    time.sleep(fake.latency)
+                with fake._lock:
+                    throttled = fake._random.random() < fake.throttle_rate
+                    fake.calls["total"] += 1
+                    if throttled:
+                        fake.calls["throttled"] += 1
+                if throttled:
+                    self._send(
+                        429,
+                        {
+                            "object": "error",
+                            "status": 429,
+                            "code": "rate_limited",
+                            "message": "Rate limited",
+                        },
+                        {"Retry-After": str(fake.retry_after)},
+                    )
+                    return
+
+                query_match = _QUERY_RE.match(path)
+                page_match = _PAGE_RE.match(path)
+                if method == "POST" and query_match:
+                    key = f"query:{query_match.group(1)}"
+                    result = fake.query(query_match.group(1), body)
+                elif method == "POST" and path == "/v1/pages":
+                    key = "pages.create"
+                    result = fake.create_page(body)
+                elif method == "PATCH" and page_match:
+                    key = "pages.update"
+                    result = fake.update_page(page_match.group(1), body)
+                else:
+                    self._send(
+                        404,
+                        {
+                            "object": "error",
+                            "status": 404,
+                            "code": "object_not_found",
+                            "message": path,
+                        },
+                    )
+                    return
+                with fake._lock:
+                    fake.calls[key] += 1
+                self._send(200, result)
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def do_PATCH(self):
+                self._handle("PATCH")
+
+        return Handler
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def reset_calls(self):
+        with self._lock:
+            self.calls.clear()
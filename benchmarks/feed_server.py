@@ -0,0 +1,146 @@
+"""
+本地RSS源服务，用于压测：按路径参数生成确定性的合成RSS，或者返回录制好的RSS文件。
+
+- GET /synthetic/{feed_id}?entries=20&size=1024  生成 entries 个条目，每个条目正文约 size 字节
+- GET /recorded/{name}                          返回 recorded_dir 下的文件
+
+响应带 ETag / Last-Modified，支持条件请求。
+"""
+
+import hashlib
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+_BASE_TIME = datetime(2024, 10, 7, 12, 0, tzinfo=timezone.utc)
+_LOREM = (
+    "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua.</p>"
+)
+
+
+def build_synthetic_feed(feed_id: str, entries: int, size: int) -> bytes:
+    body = (_LOREM * (size // len(_LOREM) + 1))[:size]
+    items = []
+    for i in range(entries):
+        published = format_datetime(_BASE_TIME - timedelta(hours=i), usegmt=True)
+        items.append(
+            "<item>"
+            f"<title>{escape(feed_id)} article {i}</title>"
+            f"<link>https://bench.local/{escape(feed_id)}/{i}</link>"
+            f"<pubDate>{published}</pubDate>"
+            f"<description>{escape(body)}</description>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<rss version="2.0"><channel>'
+        f"<title>{escape(feed_id)}</title>"
+        f"<link>https://bench.local/{escape(feed_id)}</link>"
+        f"<lastBuildDate>{format_datetime(_BASE_TIME, usegmt=True)}</lastBuildDate>"
+        + "".join(items)
+        + "</channel></rss>"
+    ).encode("utf-8")
+
+
+class FeedServer:
+    def __init__(self, recorded_dir: Optional[str] = None) -> None:
+        self.recorded_dir = recorded_dir
+        self.requests = Counter()
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def _content(self, path: str, query: dict) -> Optional[bytes]:
+        key = (path, tuple(sorted((k, v[0]) for k, v in query.items())))
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+
+        parts = path.strip("/").split("/", 1)
+        if len(parts) != 2:
+            return None
+        kind, name = parts
+        if kind == "synthetic":
+            content = build_synthetic_feed(
+                name,
+                entries=int(query.get("entries", ["20"])[0]),
+                size=int(query.get("size", ["1024"])[0]),
+            )
+        elif kind == "recorded" and self.recorded_dir:
+            file_path = os.path.join(self.recorded_dir, os.path.basename(name))
+            if not os.path.isfile(file_path):
+                return None
+            with open(file_path, "rb") as f:
+                content = f.read()
+        else:
+            return None
+
+        with self._lock:
+            self._cache[key] = content
+        return content
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                content = server._content(url.path, parse_qs(url.query))
+                if content is None:
+                    self.send_error(404)
+                    return
+
+                etag = '"%s"' % hashlib.md5(content).hexdigest()
+                last_modified = format_datetime(_BASE_TIME, usegmt=True)
+                if self.headers.get("If-None-Match") == etag:
+                    with server._lock:
+                        server.requests["not_modified"] += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                with server._lock:
+                    server.requests["ok"] += 1
+                    server.requests["bytes"] += len(content)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+                self.send_header("Content-Length", str(len(content)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                self.end_headers()
+                try:
+                    self.wfile.write(content)
+                except (BrokenPipeError, ConnectionResetError):
+                    # 客户端取满条目后会提前断开
+                    pass
+
+        return Handler
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def reset_requests(self):
+        with self._lock:
+            self.requests.clear()
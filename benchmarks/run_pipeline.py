@@ -0,0 +1,240 @@
+"""
+端到端压测：启动本地模拟的 Notion API 和RSS源服务，在子进程中运行 manage.main，
+统计 feeds/sec、articles/sec、每篇文章的 Notion 调用次数和峰值内存。
+
+结果追加写入 benchmarks/results/results.jsonl（带 git commit），并与同一场景的
+上一次结果对比，便于发现性能回退。
+
+运行: python -m benchmarks.run_pipeline [--scenario baseline ...]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from benchmarks.fake_notion import READER_DB_ID, RSS_DB_ID, FakeNotion
+from benchmarks.feed_server import FeedServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(ROOT, "benchmarks", "results", "results.jsonl")
+
+# Linux 上 ru_maxrss 会继承 fork 前父进程的峰值，优先读取 exec 后重新计数的 VmHWM
+_CHILD_CODE = """
+import json, re, resource, manage
+manage.main(force_all=True)
+max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+try:
+    with open("/proc/self/status") as f:
+        max_rss_kb = int(re.search(r"VmHWM:\\s+(\\d+)", f.read()).group(1))
+except (OSError, AttributeError):
+    pass
+print("BENCH_RESULT " + json.dumps({"max_rss_kb": max_rss_kb}))
+"""
+
+
+@dataclass
+class Scenario:
+    name: str
+    feeds: int = 50
+    entries: int = 20
+    entry_size: int = 2048
+    notion_latency: float = 0.0
+    throttle_rate: float = 0.0
+    # 先完整运行一次，只统计第二次（本地缓存已预热）的结果
+    warm: bool = False
+    env: Dict[str, str] = field(default_factory=dict)
+
+
+SCENARIOS = {
+    s.name: s
+    for s in [
+        Scenario("baseline"),
+        Scenario("large-feeds", feeds=20, entries=500, entry_size=8192),
+        Scenario("notion-latency", notion_latency=0.05, throttle_rate=0.05),
+        Scenario("warm-rerun", warm=True),
+        Scenario(
+            "notion-rate-limited",
+            feeds=10,
+            entries=5,
+            env={"NOTION_RATE_LIMIT": "3"},
+        ),
+        # 文章写入本地SQLite，不经过Notion写入限流；关闭通知，避免被群机器人的限频拖慢
+        Scenario(
+            "sqlite-sink",
+            feeds=200,
+            env={"ARTICLE_SINK": "sqlite", "WEBHOOK_URL_WECHAT": ""},
+        ),
+    ]
+}
+
+
+def _count_articles(env: Dict[str, str], notion: FakeNotion) -> int:
+    """已保存的文章数：写入本地SQLite时直接查文件，否则看 fake Notion 中的页面数"""
+    if env.get("ARTICLE_SINK") == "sqlite":
+        path = env["SINK_SQLITE_PATH"]
+        if not os.path.exists(path):
+            return 0
+        with closing(sqlite3.connect(path)) as conn:
+            return conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+    return len(notion.pages)
+
+
+def _run_child(env: Dict[str, str], cwd: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD_CODE],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"manage.main 运行失败:\n{result.stderr[-3000:]}")
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("BENCH_RESULT "):
+            return json.loads(line[len("BENCH_RESULT ") :])
+    raise RuntimeError("子进程没有输出压测结果")
+
+
+def run_scenario(scenario: Scenario) -> dict:
+    feed_server = FeedServer()
+    feed_base = feed_server.start()
+    feed_urls = [
+        f"{feed_base}/synthetic/feed-{i}?entries={scenario.entries}&size={scenario.entry_size}"
+        for i in range(scenario.feeds)
+    ]
+    notion = FakeNotion(
+        feed_urls,
+        latency=scenario.notion_latency,
+        throttle_rate=scenario.throttle_rate,
+    )
+    notion_base = notion.start()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ)
+        env.update(
+            {
+                "PYTHONPATH": ROOT,
+                "APP_ENV": "benchmark",
+                "NOTION_KEY": "benchmark",
+                "NOTION_DB_RSS": RSS_DB_ID,
+                "NOTION_DB_READER": READER_DB_ID,
+                "MOONSHOT_API_KEY": "benchmark",
+                "NOTION_BASE_URL": notion_base,
+                "WEBHOOK_URL_WECHAT": f"{notion_base}/webhook",
+                # 模拟的群机器人不限频，避免通知发送时间掩盖流水线本身的耗时
+                "WECHAT_RATE_LIMIT": "6000",
+                "LOCAL_DB_PATH": os.path.join(workdir, "bench.db"),
+                "SINK_SQLITE_PATH": os.path.join(workdir, "articles.db"),
+                "NOTION_RATE_LIMIT": "1000",
+            }
+        )
+        env.update(scenario.env)
+
+        if scenario.warm:
+            _run_child(env, workdir)
+            notion.reset_calls()
+            feed_server.reset_requests()
+            articles_before = _count_articles(env, notion)
+        else:
+            articles_before = 0
+
+        started = time.perf_counter()
+        child = _run_child(env, workdir)
+        elapsed = time.perf_counter() - started
+        articles = _count_articles(env, notion) - articles_before
+
+    feed_server.stop()
+    notion.stop()
+
+    notion_calls = notion.calls["total"]
+    return {
+        "scenario": scenario.name,
+        "elapsed_s": round(elapsed, 3),
+        "feeds": scenario.feeds,
+        "articles": articles,
+        "feeds_per_s": round(scenario.feeds / elapsed, 2),
+        "articles_per_s": round(articles / elapsed, 2),
+        "notion_calls": notion_calls,
+        "notion_throttled": notion.calls["throttled"],
+        "notion_calls_per_article": (
+            round(notion_calls / articles, 3) if articles else None
+        ),
+        "webhook_calls": notion.calls["webhook"],
+        "feed_bytes": feed_server.requests["bytes"],
+        "feed_not_modified": feed_server.requests["not_modified"],
+        "max_rss_mb": round(child["max_rss_kb"] / 1024, 1),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _load_previous(output: str) -> Dict[str, dict]:
+    previous = {}
+    if os.path.exists(output):
+        with open(output, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    previous[record["scenario"]] = record
+    return previous
+
+
+def _format_delta(current, before) -> str:
+    if not isinstance(current, (int, float)) or not isinstance(before, (int, float)):
+        return ""
+    if not before:
+        return ""
+    return f" ({(current - before) / before * 100:+.1f}%)"
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="要运行的场景，默认全部",
+    )
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    previous = _load_previous(args.output)
+    commit = _git_commit()
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+
+    for name in args.scenario or list(SCENARIOS):
+        result = run_scenario(SCENARIOS[name])
+        result.update({"commit": commit, "timestamp": int(time.time())})
+
+        before = previous.get(name, {})
+        print(f"[{name}] (上次: {before.get('commit', '-')})")
+        for key, value in result.items():
+            if key in ("scenario", "commit", "timestamp"):
+                continue
+            print(f"  {key:<26}{value}{_format_delta(value, before.get(key))}")
+
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
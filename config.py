@@ -1,51 +1,184 @@
 import logging
 import os
+import threading
 
-from dotenv import load_dotenv
 
-try:
-    load_dotenv()
-except ImportError as e:
-    logging.error(
-        "Failed to load dotenv module. Please install it. Error: {}".format(e)
-    )
-    exit(1)  # Exit the program if dotenv cannot be loaded
+class Config:
+    """
+    配置项在第一次访问时才加载 .env 和环境变量，导入本模块没有副作用；
+    必需的环境变量在创建 Notion 客户端时通过 validate() 检查。
+    """
 
+    def __init__(self) -> None:
+        self._loaded = False
+        self._lock = threading.Lock()
 
-class Config:
-    # 加载环境变量
-    NOTION_KEY = os.getenv("NOTION_KEY")
-    NOTION_DB_RSS = os.getenv("NOTION_DB_RSS")
-    NOTION_DB_READER = os.getenv("NOTION_DB_READER")
-    MOONSHOT_API_KEY = os.getenv("MOONSHOT_API_KEY")
+    def __getattr__(self, name):
+        # 只有实例上不存在的属性才会进入这里
+        if name.startswith("_") or self._loaded:
+            raise AttributeError(name)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+        return getattr(self, name)
+
+    def _load(self):
+        try:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+        except ImportError as e:
+            logging.error(
+                "Failed to load dotenv module. Please install it. Error: {}".format(e)
+            )
+            exit(1)  # Exit the program if dotenv cannot be loaded
+
+        # 加载环境变量
+        self.NOTION_KEY = os.getenv("NOTION_KEY")
+        self.NOTION_DB_RSS = os.getenv("NOTION_DB_RSS")
+        self.NOTION_DB_READER = os.getenv("NOTION_DB_READER")
+        self.MOONSHOT_API_KEY = os.getenv("MOONSHOT_API_KEY")
+        # Notion API 地址，压测时可指向本地的模拟服务
+        self.NOTION_BASE_URL = os.getenv("NOTION_BASE_URL", "https://api.notion.com")
+
+        self.WEBHOOK_URL_FEISHU = os.getenv("WEBHOOK_URL_FEISHU")
+        # 如果开启了签名校验，填写秘钥
+        self.SECRET_KEY_FEISHU = os.getenv("SECRET_KEY_FEISHU")
+
+        self.WEBHOOK_URL_WECHAT = os.getenv("WEBHOOK_URL_WECHAT")
+        # 企业微信群机器人：每分钟消息数上限、被限频后的重试次数、单条文本消息的字节上限
+        self.WECHAT_RATE_LIMIT = float(os.getenv("WECHAT_RATE_LIMIT", "20"))
+        self.WECHAT_MAX_RETRIES = int(os.getenv("WECHAT_MAX_RETRIES", "3"))
+        self.WECHAT_MESSAGE_MAX_BYTES = int(
+            os.getenv("WECHAT_MESSAGE_MAX_BYTES", "2048")
+        )
+        # 飞书自定义机器人：每分钟消息数上限、重试次数
+        self.FEISHU_RATE_LIMIT = float(os.getenv("FEISHU_RATE_LIMIT", "100"))
+        self.FEISHU_MAX_RETRIES = int(os.getenv("FEISHU_MAX_RETRIES", "3"))
+        # 企业微信应用消息：企业ID、应用AgentId、Secret、接收人（逗号分隔）、每分钟消息数上限
+        self.WECHAT_WORK_CORPID = os.getenv("WECHAT_WORK_CORPID")
+        self.WECHAT_WORK_AGENTID = os.getenv("WECHAT_WORK_AGENTID")
+        self.WECHAT_WORK_SECRET = os.getenv("WECHAT_WORK_SECRET")
+        self.WECHAT_WORK_USERS = os.getenv("WECHAT_WORK_USERS", "@all")
+        self.WECHAT_WORK_RATE_LIMIT = float(os.getenv("WECHAT_WORK_RATE_LIMIT", "30"))
+        # 进程退出前等待通知发送完成的最长时间（秒）
+        self.NOTIFY_TIMEOUT = float(os.getenv("NOTIFY_TIMEOUT", "120"))
+
+        # MongoDB 连接URL
+        self.MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
+        self.MONGODB_DB = os.getenv("MONGODB_DB", "readCopilot")
+        # 客户端连接池大小
+        self.MONGODB_POOL_SIZE = int(os.getenv("MONGODB_POOL_SIZE", "50"))
+
+        # 文章存储：notion、mongo、sqlite（本地WAL文件）或 jsonl，RSS源列表和状态始终读写Notion
+        self.ARTICLE_SINK = os.getenv("ARTICLE_SINK", "notion")
+        self.SINK_SQLITE_PATH = os.getenv("SINK_SQLITE_PATH", "data/articles.db")
+        self.SINK_JSONL_PATH = os.getenv("SINK_JSONL_PATH", "data/articles.jsonl")
+
+        # 文章正文处理结果（Markdown、Notion 块、摘要）的内存缓存条目数
+        self.CONTENT_CACHE_SIZE = int(os.getenv("CONTENT_CACHE_SIZE", "1024"))
+        # 创建Notion页面时附带的正文块数上限（不超过 100），为 0 时只写属性不写正文
+        self.NOTION_PAGE_MAX_BLOCKS = int(os.getenv("NOTION_PAGE_MAX_BLOCKS", "100"))
 
-    WEBHOOK_URL_FEISHU = os.getenv("WEBHOOK_URL_FEISHU")
-    # 如果开启了签名校验，填写秘钥
-    SECRET_KEY_FEISHU = os.getenv("SECRET_KEY_FEISHU")
+        self.APP_ENV = os.getenv("APP_ENV", "development")
 
-    WEBHOOK_URL_WECHAT = os.getenv("WEBHOOK_URL_WECHAT")
+        self.LOG_LEVEL = (
+            logging.DEBUG if self.APP_ENV == "development" else logging.INFO
+        )
+        # 日志文件按大小滚动，为空时只输出到控制台；LOG_FORMAT 可选 text 或 json
+        self.LOG_FILE = os.getenv("LOG_FILE", "run.log")
+        self.LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+        self.LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+        self.LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+
+        # Notion API 限流：每秒请求数上限，以及被限流后的最大重试次数
+        self.NOTION_RATE_LIMIT = float(os.getenv("NOTION_RATE_LIMIT", "3"))
+        self.NOTION_MAX_RETRIES = int(os.getenv("NOTION_MAX_RETRIES", "5"))
+        # 消费Notion写入队列的线程数
+        self.NOTION_WRITE_WORKERS = int(os.getenv("NOTION_WRITE_WORKERS", "1"))
+
+        # RSS抓取引擎：async（默认，单线程事件循环）或 thread（线程池）
+        self.FETCH_ENGINE = os.getenv("FETCH_ENGINE", "async")
+        # 同时进行中的RSS下载数量上限（async 引擎）
+        self.FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "200"))
+        # 线程池大小（thread 引擎）
+        self.FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "10"))
 
-    APP_ENV = os.getenv("APP_ENV", "development")
+        # RSS解析器：fast（增量解析，失败时回退到feedparser）或 feedparser
+        self.FEED_PARSER = os.getenv("FEED_PARSER", "fast")
+        # feedparser 解析和正文转换使用的进程数，默认留一个核给主进程；为 0 时在抓取线程中直接执行
+        self.CPU_WORKERS = int(
+            os.getenv("CPU_WORKERS", str(min(4, (os.cpu_count() or 1) - 1)))
+        )
+        # 单个解析/转换任务的硬性超时（秒），由工作进程中断任务；仍无响应时替换进程池
+        self.CPU_TASK_TIMEOUT = float(os.getenv("CPU_TASK_TIMEOUT", "30"))
+        # 工作进程执行这么多个任务后替换为新进程，释放累积的内存
+        self.CPU_MAX_TASKS_PER_CHILD = int(os.getenv("CPU_MAX_TASKS_PER_CHILD", "100"))
 
-    LOG_LEVEL = logging.DEBUG if APP_ENV == "development" else logging.INFO
+        # HTTP客户端：连接/读取超时（秒）与连接池大小
+        self.HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+        self.HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "60"))
+        # 单个RSS源的下载总时长上限（秒）与响应体大小上限（字节，按解压后计算）
+        self.FETCH_DEADLINE = float(os.getenv("FETCH_DEADLINE", "120"))
+        self.FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", str(10 * 1024 * 1024)))
+        # 共享会话中保留连接池的host数量
+        self.HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "50"))
+        # 每个host同时打开的连接数上限（async 引擎）
+        self.HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "20"))
 
-    # 安全检查：确保关键的环境变量都已设置
-    required_vars = {
-        "NOTION_KEY": NOTION_KEY,
-        "NOTION_DB_RSS": NOTION_DB_RSS,
-        "NOTION_DB_READER": NOTION_DB_READER,
-        "MOONSHOT_API_KEY": MOONSHOT_API_KEY,
-    }
+        # 本地持久化数据（RSS条件请求缓存等）
+        self.LOCAL_DB_PATH = os.getenv("LOCAL_DB_PATH", "data/reading_copilot.db")
+        # 自适应抓取调度：按发布频率计算每个源的抓取间隔（分钟）
+        self.SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true") == "true"
+        self.SCHEDULE_MIN_INTERVAL = float(os.getenv("SCHEDULE_MIN_INTERVAL", "30"))
+        self.SCHEDULE_MAX_INTERVAL = float(os.getenv("SCHEDULE_MAX_INTERVAL", "1440"))
+        # 判断是否到期时的容差，吸收定时任务启动时间的抖动
+        self.SCHEDULE_TOLERANCE = float(os.getenv("SCHEDULE_TOLERANCE", "5"))
+        # 忽略调度，抓取所有激活的源
+        self.FORCE_ALL_FEEDS = os.getenv("FORCE_ALL_FEEDS", "false") == "true"
 
-    missing_vars = [key for key, value in required_vars.items() if not value]
+        # 常驻模式（manage.py serve）：两轮抓取的间隔、RSS源列表重新加载间隔（秒）
+        self.DAEMON_CYCLE_INTERVAL = float(os.getenv("DAEMON_CYCLE_INTERVAL", "300"))
+        self.DAEMON_FEED_RELOAD_INTERVAL = float(
+            os.getenv("DAEMON_FEED_RELOAD_INTERVAL", "3600")
+        )
+        # 健康检查服务监听地址，端口为 0 时不启动
+        self.DAEMON_HEALTH_HOST = os.getenv("DAEMON_HEALTH_HOST", "127.0.0.1")
+        self.DAEMON_HEALTH_PORT = int(os.getenv("DAEMON_HEALTH_PORT", "8080"))
 
-    if missing_vars:
-        logging.error(
-            f"Missing critical environment variables: {', '.join(missing_vars)}"
+        # 每次运行前增量同步Notion文章库到本地镜像
+        self.NOTION_MIRROR_ENABLED = (
+            os.getenv("NOTION_MIRROR_ENABLED", "true") == "true"
         )
-        raise EnvironmentError(
-            f"Missing environment variables: {', '.join(missing_vars)}"
+
+        # 运行指标输出路径（Prometheus 文本文件、JSON 汇总），为空时不输出
+        self.METRICS_PROMETHEUS_PATH = os.getenv(
+            "METRICS_PROMETHEUS_PATH", "data/metrics/reading_copilot.prom"
         )
+        self.METRICS_JSON_PATH = os.getenv(
+            "METRICS_JSON_PATH", "data/metrics/summary.json"
+        )
+
+        self._loaded = True
+
+    def validate(self):
+        """安全检查：确保关键的环境变量都已设置"""
+        required_vars = {
+            "NOTION_KEY": self.NOTION_KEY,
+            "NOTION_DB_RSS": self.NOTION_DB_RSS,
+            "NOTION_DB_READER": self.NOTION_DB_READER,
+            "MOONSHOT_API_KEY": self.MOONSHOT_API_KEY,
+        }
+
+        missing_vars = [key for key, value in required_vars.items() if not value]
+
+        if missing_vars:
+            logging.error(
+                f"Missing critical environment variables: {', '.join(missing_vars)}"
+            )
+            raise EnvironmentError(
+                f"Missing environment variables: {', '.join(missing_vars)}"
+            )
 
 
 config = Config()
@@ -1,33 +1,67 @@
-import concurrent.futures
+import argparse
 import os
 
-from app.log import logger
-from app.notion_manager import get_active_rss_feeds
-from app.rss_fetcher import process_rss_feed
+from app import metrics, notifier, notion_mirror, pipeline
+from app.log import logger, logging, setup_logging
+from app.notion_manager import rebuild_link_index
+from config import config
 
 
-def main():
-    logger.debug("Printing all environment variables:")
-    for key, value in os.environ.items():
-        logger.debug(f"{key}: {value}")
+def main(force_all: bool = False):
+    setup_logging()
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Printing all environment variables:")
+        for key, value in os.environ.items():
+            logger.debug(f"{key}: {value}")
 
-    active_rss_feeds = get_active_rss_feeds()
-    logger.debug(f"Active RSS Feeds: {active_rss_feeds}")
+    pipeline.run_once(force_all=force_all)
+    # 通知在后台发送，退出前等待发送完成，再写出包含通知耗时的运行指标
+    notifier.dispatcher.wait(timeout=config.NOTIFY_TIMEOUT)
+    metrics.registry.export()
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_rss = {
-            executor.submit(process_rss_feed, rss_feed): rss_feed
-            for rss_feed in active_rss_feeds
-        }
 
-        for future in concurrent.futures.as_completed(future_to_rss):
-            rss_feed = future_to_rss[future]
-            try:
-                messages = future.result()
-                logger.info(f"处理完成: {rss_feed.title}")
-            except Exception as exc:
-                logger.error(f"处理 {rss_feed.title} 时发生错误: {exc}")
+def serve(force_all: bool = False):
+    from app.daemon import Daemon
+
+    setup_logging()
+
+    Daemon(force_all=force_all).serve()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="RSS to Notion")
+    parser.add_argument(
+        "--force-all", action="store_true", help="忽略调度，抓取所有激活的RSS源"
+    )
+    # 子命令也接受 --force-all；不设默认值，避免覆盖写在子命令前面的同名参数
+    force_all = argparse.ArgumentParser(add_help=False)
+    force_all.add_argument(
+        "--force-all",
+        action="store_true",
+        default=argparse.SUPPRESS,
+        help="忽略调度，抓取所有激活的RSS源",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser(
+        "run", parents=[force_all], help="抓取到了抓取时间的RSS源（默认）"
+    )
+    subparsers.add_parser(
+        "serve", parents=[force_all], help="常驻模式，按固定间隔循环抓取"
+    )
+    subparsers.add_parser("rebuild-index", help="从Notion重建本地文章链接索引")
+    sync_parser = subparsers.add_parser("sync-mirror", help="同步Notion文章库到本地")
+    sync_parser.add_argument("--full", action="store_true", help="全量同步")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    main()
+    setup_logging()
+    args = parse_args()
+    if args.command == "rebuild-index":
+        rebuild_link_index()
+    elif args.command == "sync-mirror":
+        notion_mirror.sync(full=args.full)
+    elif args.command == "serve":
+        serve(force_all=args.force_all)
+    else:
+        main(force_all=args.force_all)
@@ -0,0 +1,17 @@
+import pytest
+
+# 以下是需要联网或依赖旧目录结构的手工调试脚本，不作为自动化测试收集
+collect_ignore = ["print_code.py", "test.py", "test_feedparser.py", "test_image.py"]
+
+
+@pytest.fixture
+def local_db(monkeypatch, tmp_path):
+    """本地SQLite存储指向临时文件，测试之间互不影响"""
+    from app import local_store
+    from config import config
+
+    monkeypatch.setattr(config, "LOCAL_DB_PATH", str(tmp_path / "local.db"))
+    monkeypatch.setattr(local_store, "_connection", None)
+    yield
+    if local_store._connection is not None:
+        local_store._connection.close()
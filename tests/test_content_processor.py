@@ -0,0 +1,172 @@
+import pytest
+
+from app import content_processor
+from app.content_processor import (
+    NOTION_RICH_TEXT_MAX_ITEMS,
+    NOTION_TEXT_MAX_CHARS,
+    _LRUCache,
+    _get_markdown_parser,
+    _inline_segments,
+    markdown_to_blocks,
+    page_children,
+    process_many,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(content_processor, "_cache", _LRUCache(maxsize=100))
+
+
+def _inline(markdown: str):
+    tokens = _get_markdown_parser().parse(markdown)
+    return next(token for token in tokens if token.type == "inline").children
+
+
+def _contents(rich_text):
+    return [item["text"]["content"] for item in rich_text]
+
+
+def test_inline_segments_merge_same_style():
+    [(kind, rich_text)] = _inline_segments(_inline("hello\nworld **bold** end"))
+
+    assert kind == "text"
+    assert _contents(rich_text) == ["hello world ", "bold", " end"]
+    assert "annotations" not in rich_text[0]
+    assert rich_text[1]["annotations"]["bold"] is True
+
+
+def test_inline_segments_links_and_code():
+    [(_, rich_text)] = _inline_segments(
+        _inline("[site](https://example.com) `x` [rel](/a)")
+    )
+
+    assert _contents(rich_text) == ["site", " ", "x", " rel"]
+    assert rich_text[0]["text"]["link"] == {"url": "https://example.com"}
+    assert rich_text[2]["annotations"]["code"] is True
+    # 相对链接不能作为 Notion 链接，只保留文字，与前面的普通文本合并
+    assert rich_text[-1]["text"] == {"content": " rel", "link": None}
+
+
+def test_inline_segments_split_at_images():
+    segments = _inline_segments(
+        _inline("before ![pic](https://example.com/a.png) after ![x](/local.png)")
+    )
+
+    assert [kind for kind, _ in segments] == ["text", "image", "text"]
+    image = segments[1][1]["image"]
+    assert image["external"]["url"] == "https://example.com/a.png"
+    assert _contents(image["caption"]) == ["pic"]
+    # 不能外链的图片保留替代文字
+    assert _contents(segments[2][1]) == [" after x"]
+
+
+def test_long_text_split_into_notion_sized_items():
+    blocks, text = markdown_to_blocks("a" * (NOTION_TEXT_MAX_CHARS * 2 + 10))
+
+    rich_text = blocks[0]["paragraph"]["rich_text"]
+    assert [len(item["text"]["content"]) for item in rich_text] == [
+        NOTION_TEXT_MAX_CHARS,
+        NOTION_TEXT_MAX_CHARS,
+        10,
+    ]
+    assert len(text) == NOTION_TEXT_MAX_CHARS * 2 + 10
+
+
+def test_rich_text_items_capped_per_block():
+    markdown = " ".join(f"**{i}** x" for i in range(NOTION_RICH_TEXT_MAX_ITEMS))
+    blocks, _ = markdown_to_blocks(markdown)
+
+    assert len(blocks[0]["paragraph"]["rich_text"]) == NOTION_RICH_TEXT_MAX_ITEMS
+
+
+def test_markdown_to_blocks_block_types():
+    markdown = "\n".join(
+        [
+            "# Title",
+            "#### Deep",
+            "",
+            "- one",
+            "  1. nested",
+            "",
+            "> quoted",
+            "",
+            "```",
+            "code",
+            "```",
+            "",
+            "---",
+        ]
+    )
+    blocks, text = markdown_to_blocks(markdown)
+
+    assert [block["type"] for block in blocks] == [
+        "heading_1",
+        "heading_3",
+        "bulleted_list_item",
+        "numbered_list_item",
+        "quote",
+        "code",
+        "divider",
+    ]
+    assert text == "Title\nDeep\none\nnested\nquoted\ncode"
+
+
+def test_table_cells_rendered_as_rich_text():
+    markdown = "| a | b |\n|---|---|\n| 1 | **2** |\n|  |  |\n"
+    blocks, text = markdown_to_blocks(markdown)
+
+    assert [block["type"] for block in blocks] == ["paragraph", "paragraph"]
+    row = blocks[1]["paragraph"]["rich_text"]
+    assert _contents(row) == ["1", " | ", "2"]
+    assert row[2]["annotations"]["bold"] is True
+    assert text == "a | b\n1 | 2"
+
+
+def test_page_children_truncates_with_source_link():
+    markdown = "\n\n".join(f"paragraph {i}" for i in range(10))
+
+    children = page_children(markdown, "https://example.com/post", max_blocks=5)
+    assert len(children) == 5
+    last = children[-1]["paragraph"]["rich_text"][0]
+    assert last["text"] == {
+        "content": "阅读原文",
+        "link": {"url": "https://example.com/post"},
+    }
+
+    assert len(page_children(markdown, None, max_blocks=5)) == 5
+    assert len(page_children(markdown, "https://example.com/post", 20)) == 10
+    assert page_children(markdown, "https://example.com/post", max_blocks=0) == []
+
+
+def test_process_many_converts_misses_in_one_task(monkeypatch):
+    calls = []
+
+    def run(fn, htmls):
+        calls.append(list(htmls))
+        return fn(htmls)
+
+    from app import cpu_pool
+
+    monkeypatch.setattr(cpu_pool, "run", run)
+
+    first = process_many(["<p>a</p>", "<p>b</p>"])
+    second = process_many(["<p>b</p>", "<p>c</p>", "<p>a</p>"])
+
+    assert calls == [["<p>a</p>", "<p>b</p>"], ["<p>c</p>"]]
+    assert second[0] is first[1] and second[2] is first[0]
+    assert second[1].summary == "c"
+    # 转换结果的块按Markdown预先放进缓存，写入Notion时不再解析
+    assert content_processor.notion_blocks(first[0].markdown) is first[0].blocks
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = _LRUCache(maxsize=2)
+    cache.put(("k", "1"), 1)
+    cache.put(("k", "2"), 2)
+    assert cache.get(("k", "1")) == 1
+    cache.put(("k", "3"), 3)
+
+    assert cache.get(("k", "2")) is None
+    assert cache.get(("k", "1")) == 1 and cache.get(("k", "3")) == 3
+    assert _LRUCache(maxsize=0).put(("k", "1"), 1) is None
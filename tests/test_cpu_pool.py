@@ -0,0 +1,128 @@
+import os
+import pathlib
+import signal
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import cpu_pool
+from app.cpu_pool import CpuPool, TaskTimeoutError
+
+
+def _ignore_alarm_and_sleep(seconds: float) -> float:
+    """模拟卡在 C 扩展中、不响应工作进程内超时的任务"""
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    time.sleep(seconds)
+    return seconds
+
+
+def _sleep_and_return(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def _record_and_sleep(path: str, seconds: float) -> float:
+    """每次开始执行都记一行，用来确认任务没有被终止后重跑"""
+    with open(path, "a") as f:
+        f.write("started\n")
+    time.sleep(seconds)
+    return seconds
+
+
+def test_timeout_interrupts_task_and_keeps_worker():
+    pool = CpuPool(workers=1, max_tasks_per_child=10, timeout=0.5)
+    try:
+        started = time.monotonic()
+        with pytest.raises(TaskTimeoutError):
+            pool.run(time.sleep, 10)
+        assert time.monotonic() - started < cpu_pool._TIMEOUT_GRACE
+        generation = pool._generation
+
+        assert pool.run(pow, 2, 3) == 8
+        assert pool._generation is generation
+    finally:
+        pool.shutdown()
+
+
+def test_stuck_worker_replaces_pool_without_killing_other_tasks(monkeypatch, tmp_path):
+    monkeypatch.setattr(cpu_pool, "_TIMEOUT_GRACE", 0.5)
+    pool = CpuPool(workers=2, max_tasks_per_child=10, timeout=0.5)
+    marker = tmp_path / "started.txt"
+    results = []
+    other = threading.Thread(
+        target=lambda: results.append(
+            pool.run(_record_and_sleep, str(marker), 2, timeout=10)
+        )
+    )
+    try:
+        assert pool.run(pow, 2, 3) == 8
+        generation = pool._generation
+        other.start()
+        with pytest.raises(TaskTimeoutError):
+            pool.run(_ignore_alarm_and_sleep, 3)
+
+        assert pool.run(pow, 2, 3) == 8
+        assert pool._generation is not generation
+        other.join()
+        assert results == [2]
+        # 另一个任务在旧进程池中执行完成，没有被终止后重新提交
+        assert marker.read_text().count("started") == 1
+    finally:
+        pool.shutdown()
+
+
+def test_queue_wait_does_not_count_towards_timeout(monkeypatch):
+    monkeypatch.setattr(cpu_pool, "_TIMEOUT_GRACE", 0.2)
+    pool = CpuPool(workers=1, max_tasks_per_child=100, timeout=1.0)
+    try:
+        # 单个工作进程上排队的任务累计等待远超超时，但每个任务本身只执行 0.3s
+        with ThreadPoolExecutor(max_workers=8) as threads:
+            results = list(
+                threads.map(lambda _: pool.run(_sleep_and_return, 0.3), range(8))
+            )
+        assert results == [0.3] * 8
+        assert pool._retired == []
+    finally:
+        pool.shutdown()
+
+
+def test_stuck_worker_does_not_block_exit(tmp_path):
+    # concurrent.futures 在解释器退出时会等待所有进程池，卡死的工作进程必须被终止
+    script = tmp_path / "stuck.py"
+    script.write_text(textwrap.dedent("""
+        import signal
+        import time
+
+        from app import cpu_pool
+
+
+        def stuck(seconds):
+            signal.signal(signal.SIGALRM, signal.SIG_IGN)
+            time.sleep(seconds)
+
+
+        if __name__ == "__main__":
+            cpu_pool._TIMEOUT_GRACE = 0.5
+            pool = cpu_pool.CpuPool(workers=1, max_tasks_per_child=10, timeout=0.5)
+            try:
+                pool.run(stuck, 60)
+            except cpu_pool.TaskTimeoutError:
+                print("timeout")
+    """))
+    root = str(pathlib.Path(__file__).resolve().parent.parent)
+    started = time.monotonic()
+    result = subprocess.run(
+        [sys.executable, str(script)],
+        cwd=root,
+        env=dict(os.environ, PYTHONPATH=root),
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+    assert "timeout" in result.stdout
+    assert time.monotonic() - started < 15
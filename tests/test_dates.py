@@ -0,0 +1,24 @@
+import pytest
+
+from app.dates import parse_date
+
+
+def test_parse_rfc822():
+    assert parse_date("Mon, 07 Oct 2024 10:00:00 GMT") == "2024-10-07T18:00:00+08:00"
+
+
+def test_parse_iso8601():
+    assert parse_date("2024-10-07T10:00:00+08:00") == "2024-10-07T10:00:00+08:00"
+
+
+@pytest.mark.parametrize(
+    "date_str",
+    [
+        "Mon, 31 Feb 2024 10:00:00 GMT",
+        "Mon, 07 Oct 2024 25:00:00 GMT",
+        "Mon, 07 Oct 2024 10:61:00 +0800",
+        "not a date",
+    ],
+)
+def test_invalid_dates_return_none(date_str):
+    assert parse_date(date_str) is None
@@ -0,0 +1,93 @@
+import pytest
+
+from app import cpu_pool
+from app.content_processor import html_to_markdown
+from app.feed_parser import (
+    FastFeedParser,
+    FeedParseError,
+    StreamingFeedParser,
+    parse_with_feedparser,
+)
+
+# &nbsp; 不是 XML 预定义的实体，严格的 XML 解析器会报错，feedparser 可以处理
+HTML_ENTITY_FEED = b"""<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0"><channel>
+<title>Example</title>
+<lastBuildDate>Mon, 07 Oct 2024 10:00:00 GMT</lastBuildDate>
+<item><title>First&nbsp;post</title><link>https://example.com/1</link>
+<pubDate>Mon, 07 Oct 2024 09:00:00 GMT</pubDate><description>hello</description></item>
+<item><title>Second</title><link>https://example.com/2</link></item>
+</channel></rss>"""
+
+XHTML_FEED = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Example</title>
+<updated>2024-10-07T10:00:00Z</updated>
+<entry><title>Post</title><link href="https://example.com/1"/>
+<content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>hi <b>there</b></p>\
+<ul><li>a</li><li>b</li></ul><img src="https://example.com/a.png" alt="pic"/></div></content>
+</entry></feed>"""
+
+
+def _stream(content: bytes, chunk_size: int = 16) -> StreamingFeedParser:
+    parser = StreamingFeedParser(max_entries=20)
+    for i in range(0, len(content), chunk_size):
+        if parser.feed(content[i : i + chunk_size]):
+            break
+    return parser
+
+
+def test_fast_parser_wraps_deferred_parse_error():
+    parser = FastFeedParser()
+    with pytest.raises(FeedParseError):
+        parser.feed(HTML_ENTITY_FEED)
+        parser.close()
+
+
+def test_html_entity_feed_falls_back_to_feedparser(monkeypatch):
+    # 在当前进程中执行 feedparser
+    monkeypatch.setattr(cpu_pool.pool, "_workers", 0)
+    feed = _stream(HTML_ENTITY_FEED).close()
+
+    assert feed.backend == "feedparser"
+    assert [entry.link for entry in feed.entries] == [
+        "https://example.com/1",
+        "https://example.com/2",
+    ]
+    assert feed.entries[0].title == "First\xa0post"
+
+
+def test_well_formed_feed_uses_fast_parser():
+    feed = _stream(HTML_ENTITY_FEED.replace(b"&nbsp;", b" ")).close()
+
+    assert feed.backend == "fast"
+    assert feed.entries[0].title == "First post"
+    assert feed.updated == "Mon, 07 Oct 2024 10:00:00 GMT"
+
+
+def test_chunks_released_after_early_stop():
+    items = b"".join(
+        b"<item><title>t%d</title><link>https://example.com/%d</link></item>" % (i, i)
+        for i in range(50)
+    )
+    content = b"<rss><channel>" + items + b"</channel></rss>"
+    parser = StreamingFeedParser(max_entries=5)
+    stopped = False
+    for i in range(0, len(content), 64):
+        if parser.feed(content[i : i + 64]):
+            stopped = True
+            break
+
+    assert stopped
+    assert parser._chunks == []
+    assert len(parser.close().entries) == 5
+
+
+def test_xhtml_content_matches_feedparser():
+    parser = FastFeedParser()
+    parser.feed(XHTML_FEED)
+    fast = parser.close().entries[0].content
+    reference = parse_with_feedparser(XHTML_FEED, 20).entries[0].content
+
+    assert "html:" not in fast and not fast.startswith("<div")
+    assert html_to_markdown(fast) == html_to_markdown(reference)
+    assert "**there**" in html_to_markdown(fast)
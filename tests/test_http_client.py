@@ -0,0 +1,96 @@
+import gzip
+import http.server
+import threading
+import time
+
+import pytest
+
+from app import http_client
+
+
+def test_close_session_resets_shared_session():
+    first = http_client.get_session()
+    assert http_client.get_session() is first
+
+    http_client.close_session()
+    second = http_client.get_session()
+
+    assert second is not first
+    http_client.close_session()
+    assert http_client._session is None
+
+
+def test_host_limit_per_session_and_host():
+    import asyncio
+
+    import aiohttp
+
+    async def check():
+        async with aiohttp.ClientSession() as first, aiohttp.ClientSession() as second:
+            limit = http_client.host_limit(first, "https://rsshub.app/a")
+            assert http_client.host_limit(first, "https://rsshub.app/b") is limit
+            assert http_client.host_limit(first, "https://example.com/") is not limit
+            assert http_client.host_limit(second, "https://rsshub.app/a") is not limit
+
+    asyncio.run(check())
+
+
+class _SlowHandler(http.server.BaseHTTPRequestHandler):
+    """/slow 每 0.1s 发送 1 个字节；/gzip 和 /chunked 正常返回完整内容"""
+
+    protocol_version = "HTTP/1.1"
+    body = b"<rss>" + b"x" * 100_000 + b"</rss>"
+
+    def do_GET(self):
+        self.send_response(200)
+        if self.path == "/slow":
+            self.send_header("Content-Length", "1000")
+            self.end_headers()
+            for _ in range(1000):
+                self.wfile.write(b"x")
+                self.wfile.flush()
+                time.sleep(0.1)
+        elif self.path == "/gzip":
+            data = gzip.compress(self.body)
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i in range(0, len(self.body), 30_000):
+                part = self.body[i : i + 30_000]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+            self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slow_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _SlowHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_iter_limited_deadline_with_trickling_server(slow_server):
+    started = time.monotonic()
+    with http_client.get(f"{slow_server}/slow", stream=True) as response:
+        with pytest.raises(http_client.ResponseLimitError):
+            for _ in http_client.iter_limited(response, 10_000, started + 0.5):
+                pass
+    assert time.monotonic() - started < 1.5
+
+
+@pytest.mark.parametrize("path", ["/gzip", "/chunked"])
+def test_iter_limited_reads_whole_body(slow_server, path):
+    with http_client.get(f"{slow_server}{path}", stream=True) as response:
+        chunks = list(
+            http_client.iter_limited(response, 1_000_000, time.monotonic() + 10)
+        )
+    assert b"".join(chunks) == _SlowHandler.body
@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 在新进程中导入入口和全部模块，检查没有读取配置、没有导入 dotenv、没有启动线程
+_CHECK = """
+import importlib, pkgutil, sys, threading
+import app, manage
+for module in pkgutil.iter_modules(app.__path__):
+    importlib.import_module("app." + module.name)
+from config import config
+print(config._loaded, "dotenv" in sys.modules, threading.active_count())
+"""
+
+
+def test_import_has_no_side_effects():
+    result = subprocess.run(
+        [sys.executable, "-c", _CHECK],
+        cwd=ROOT,
+        env=dict(os.environ, PYTHONPATH=ROOT),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.split() == ["False", "False", "1"]
@@ -0,0 +1,39 @@
+from app import local_store
+
+
+def test_registered_schema_applied_to_new_connections(monkeypatch, local_db):
+    monkeypatch.setattr(local_store, "_schemas", list(local_store._schemas))
+    local_store.register_schema(
+        "CREATE TABLE IF NOT EXISTS schema_probe (key TEXT PRIMARY KEY)"
+    )
+    local_store.get_connection().execute("INSERT INTO schema_probe VALUES ('a')")
+
+    # 已有连接上登记的语句在下一次获取连接时执行
+    local_store.register_schema(
+        "CREATE TABLE IF NOT EXISTS schema_probe_late (key TEXT PRIMARY KEY)"
+    )
+    tables = {
+        row[0]
+        for row in local_store.get_connection().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )
+    }
+    assert {"schema_probe", "schema_probe_late", "feed_validators"} <= tables
+
+
+def test_store_modules_work_on_a_fresh_database(monkeypatch, local_db):
+    import time
+
+    from app import feed_cache, link_index, media_cache, scheduler, token_cache
+
+    monkeypatch.setattr(link_index, "_links", None)
+    feed_cache.save_validator("https://example.com/rss", 200, {"ETag": '"v1"'})
+    media_cache.save("key", "media-id")
+    scheduler.record_fetch("feed", success=True)
+    token_cache._save("key", "token", time.time() + 7200)
+
+    assert feed_cache.get_validator("https://example.com/rss").etag == '"v1"'
+    assert media_cache.get("key") == "media-id"
+    assert not scheduler.is_due("feed")
+    assert token_cache._load("key")[0] == "token"
+    assert not link_index.contains("https://example.com/1")
@@ -0,0 +1,31 @@
+import io
+import json
+import logging
+import logging.handlers
+import queue
+
+from app.log import JsonFormatter, _QueueHandler
+
+
+def test_json_formatter_keeps_exception_through_queue():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, handler)
+
+    log = logging.getLogger("test_json_exc_info")
+    log.propagate = False
+    log.addHandler(_QueueHandler(log_queue))
+    listener.start()
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("失败: %s", "feed-1")
+    finally:
+        listener.stop()
+
+    payload = json.loads(stream.getvalue())
+    assert payload["message"] == "失败: feed-1"
+    assert "ValueError: boom" in payload["exc_info"]
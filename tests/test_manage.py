@@ -0,0 +1,21 @@
+import pytest
+
+from manage import parse_args
+
+
+@pytest.mark.parametrize(
+    "argv, command, force_all",
+    [
+        ([], None, False),
+        (["--force-all"], None, True),
+        (["run"], "run", False),
+        (["run", "--force-all"], "run", True),
+        (["--force-all", "run"], "run", True),
+        (["serve", "--force-all"], "serve", True),
+        (["--force-all", "serve"], "serve", True),
+    ],
+)
+def test_force_all_before_or_after_command(argv, command, force_all):
+    args = parse_args(argv)
+    assert args.command == command
+    assert args.force_all is force_all
@@ -0,0 +1,59 @@
+import pytest
+
+from app import notifier, wechat_work
+from app.send_message import WebhookError
+from config import config
+
+
+class FakeWechatWork:
+    """第一次发送返回 token 过期，之后成功；记录用到和清除的 token"""
+
+    def __init__(self, token_errors=1, **kwargs):
+        self.token_errors = token_errors
+        self.tokens = ["token-1", "token-2", "token-3"]
+        self.sent = []
+        self.invalidated = []
+
+    def get_access_token(self):
+        return self.tokens[0]
+
+    def invalidate_access_token(self, access_token=None):
+        self.invalidated.append(access_token)
+        if self.tokens[0] == access_token:
+            self.tokens.pop(0)
+
+    def send_message(self, msg_type, users, content=None, access_token=None):
+        self.sent.append(access_token)
+        if self.token_errors:
+            self.token_errors -= 1
+            return {"errcode": 42001, "errmsg": "access_token expired"}
+        return {"errcode": 0, "errmsg": "ok"}
+
+
+def _channel(monkeypatch, client):
+    monkeypatch.setattr(config, "WECHAT_WORK_USERS", "ZhangSan")
+    monkeypatch.setattr(wechat_work, "WechatWork", lambda **kwargs: client)
+    return notifier._wechat_work_channel()
+
+
+def test_wechat_work_refreshes_expired_token_outside_limiter(monkeypatch):
+    client = FakeWechatWork()
+    channel = _channel(monkeypatch, client)
+
+    channel.limiter.call(channel.send, "hello")
+
+    assert client.invalidated == ["token-1"]
+    assert client.sent == ["token-1", "token-2"]
+    stats = channel.limiter.stats()
+    assert stats["retries"] == 0 and stats["throttles"] == 0
+
+
+def test_wechat_work_token_error_after_refresh_is_not_retried(monkeypatch):
+    client = FakeWechatWork(token_errors=2)
+    channel = _channel(monkeypatch, client)
+
+    with pytest.raises(WebhookError):
+        channel.limiter.call(channel.send, "hello")
+
+    assert client.invalidated == ["token-1", "token-2"]
+    assert channel.limiter.stats()["retries"] == 0
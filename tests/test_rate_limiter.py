@@ -0,0 +1,108 @@
+import pytest
+
+from app import rate_limiter
+from app.rate_limiter import AdaptiveRateLimiter, TokenBucket
+
+
+class FakeClock:
+    """替换 rate_limiter 模块中的 time，sleep 只推进时间并记录"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        # 与真实的 sleep 一样至少经过一小段时间，浮点误差剩下的极小等待不会原地打转
+        self.now += max(seconds, 1e-6)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+class Throttled(Exception):
+    def __init__(self, retry_after=None) -> None:
+        self.retry_after = retry_after
+
+
+def _failing(errors):
+    """依次抛出 errors 中的异常，之后返回 "ok" """
+    errors = list(errors)
+
+    def func():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    return func
+
+
+def _limiter(**kwargs) -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter(
+        is_throttled=lambda e: isinstance(e, Throttled),
+        get_retry_after=lambda e: e.retry_after,
+        **kwargs,
+    )
+
+
+def test_token_bucket_rate_and_capacity(clock):
+    bucket = TokenBucket(rate=2, capacity=1)
+
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.5, 0.5]
+    # 空闲很久也最多积累 capacity 个令牌
+    clock.now += 10
+    assert [bucket.acquire() for _ in range(2)] == [0.0, 0.5]
+
+
+def test_token_bucket_block_for(clock):
+    bucket = TokenBucket(rate=10, capacity=10)
+    bucket.block_for(3)
+    bucket.block_for(1)
+
+    assert bucket.acquire() == pytest.approx(3)
+
+
+def test_retry_after_is_honoured(clock):
+    limiter = _limiter(max_rate=4)
+
+    assert limiter.call(_failing([Throttled(retry_after=7)])) == "ok"
+
+    assert clock.sleeps == [7]
+    stats = limiter.stats()
+    assert (stats["calls"], stats["throttles"], stats["retries"]) == (1, 1, 1)
+    assert stats["wait_time"] == 7
+    # 降速一半，成功后加 0.1
+    assert stats["rate"] == 2.1
+
+
+def test_backoff_grows_and_rate_recovers(clock):
+    limiter = _limiter(max_rate=4, min_rate=0.6)
+
+    limiter.call(_failing([Throttled(), Throttled(), Throttled()]))
+    assert clock.sleeps == [1, 2, 4]
+    # 4 -> 2 -> 1 -> 0.6（不低于 min_rate），成功后 +0.1
+    assert limiter.stats()["rate"] == 0.7
+
+    for _ in range(50):
+        limiter.call(lambda: None)
+    assert limiter.stats()["rate"] == 4
+
+
+def test_gives_up_after_max_retries_and_on_other_errors(clock):
+    limiter = _limiter(max_rate=4, max_retries=2)
+
+    with pytest.raises(Throttled):
+        limiter.call(_failing([Throttled()] * 3))
+    assert limiter.stats()["retries"] == 2
+
+    with pytest.raises(ValueError):
+        limiter.call(_failing([ValueError()]))
+    assert limiter.stats()["retries"] == 2
+    assert limiter.stats()["calls"] == 2
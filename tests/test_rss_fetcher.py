@@ -0,0 +1,94 @@
+import asyncio
+
+from app import rss_fetcher
+from app.content_processor import ProcessedContent
+from app.feed_parser import FeedParseError, StreamingFeedParser
+from app.model.rss_item import RSSItem
+
+FEED = b"""<rss version="2.0"><channel><title>Example</title>
+<lastBuildDate>Mon, 07 Oct 2024 10:00:00 GMT</lastBuildDate>
+<item><title>First</title><link>https://example.com/1</link></item>
+</channel></rss>"""
+
+
+def _rss_info(link: str = "https://example.com/rss") -> RSSItem:
+    return RSSItem(
+        id="feed-1",
+        title="Example",
+        link=link,
+        ai_summary_enabled=False,
+        tags=[],
+        updated=None,
+    )
+
+
+def _response() -> rss_fetcher.FeedResponse:
+    parser = StreamingFeedParser()
+    parser.feed(FEED)
+    return rss_fetcher.FeedResponse(status=200, headers={}, parser=parser)
+
+
+def test_async_parse_error_marks_feed(monkeypatch):
+    async def broken_download(session, rss_url, feed=""):
+        raise FeedParseError("broken")
+
+    marked = []
+    monkeypatch.setattr(rss_fetcher, "download_feed_async", broken_download)
+    monkeypatch.setattr(
+        rss_fetcher, "mark_feed_error", lambda rss_info, remarks: marked.append(remarks)
+    )
+
+    rss_info = _rss_info()
+    articles = asyncio.run(rss_fetcher.fetch_rss_content_async(None, rss_info))
+
+    assert articles == []
+    assert len(marked) == 1 and marked[0].startswith("解析错误")
+
+
+def test_mark_feed_error_clears_validator(monkeypatch, local_db):
+    from app import feed_cache, scheduler
+
+    monkeypatch.setattr(scheduler, "record_fetch", lambda *args, **kwargs: None)
+    monkeypatch.setattr(
+        rss_fetcher.writer, "submit_status", lambda *args, **kwargs: None
+    )
+    url = "https://example.com/rss"
+    feed_cache.save_validator(url, 200, {"ETag": '"v1"'})
+    assert feed_cache.get_conditional_headers(url) == {"If-None-Match": '"v1"'}
+
+    rss_info = _rss_info(url)
+    rss_fetcher.mark_feed_error(rss_info, "网络错误")
+
+    # 出错后下次抓取完整内容，成功时状态会恢复为"活跃"
+    assert feed_cache.get_conditional_headers(url) == {}
+
+
+def test_submitted_status_updates_cached_feed(monkeypatch):
+    from app import feed_cache, scheduler, sinks
+
+    lookups = []
+    statuses = []
+    monkeypatch.setattr(scheduler, "record_fetch", lambda *args, **kwargs: None)
+    monkeypatch.setattr(feed_cache, "save_validator", lambda *args: None)
+    monkeypatch.setattr(
+        sinks, "filter_existing", lambda links: lookups.append(links) or set()
+    )
+    monkeypatch.setattr(
+        rss_fetcher,
+        "convert_contents",
+        lambda htmls, labels: [ProcessedContent(h, h) for h in htmls],
+    )
+    monkeypatch.setattr(
+        rss_fetcher.writer,
+        "submit_status",
+        lambda **kwargs: statuses.append(kwargs["updated_time"]),
+    )
+
+    rss_info = _rss_info()
+    articles = rss_fetcher.handle_feed_response(rss_info, _response())
+    assert [article.link for article in articles] == ["https://example.com/1"]
+    assert rss_info.updated == statuses[0]
+
+    # 常驻模式下一轮复用同一个 RSSItem，源没有变化时不再查重、不再提交状态
+    assert rss_fetcher.handle_feed_response(rss_info, _response()) == []
+    assert len(lookups) == 1 and len(statuses) == 1
@@ -0,0 +1,97 @@
+import pytest
+
+from app import scheduler
+from config import config
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+
+
+@pytest.fixture(autouse=True)
+def schedule_config(monkeypatch, local_db):
+    monkeypatch.setattr(config, "SCHEDULE_MIN_INTERVAL", 10)
+    monkeypatch.setattr(config, "SCHEDULE_MAX_INTERVAL", 240)
+    monkeypatch.setattr(config, "SCHEDULE_TOLERANCE", 5)
+
+
+def _iso(ts: float) -> str:
+    from datetime import datetime, timezone
+
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+def _schedule(feed_id: str):
+    from app.local_store import get_connection
+
+    return (
+        get_connection()
+        .execute(
+            "SELECT next_due, interval, failures FROM feed_schedule WHERE feed_id = ?",
+            (feed_id,),
+        )
+        .fetchone()
+    )
+
+
+@pytest.mark.parametrize(
+    "published, expected",
+    [
+        ([], 10 * MINUTE),
+        ([1000.0], 10 * MINUTE),
+        # 间隔 2h、2h、4h，中位数 2h 的一半
+        ([0, 2 * HOUR, 4 * HOUR, 8 * HOUR], 1 * HOUR),
+        # 重复的发布时间不参与计算
+        ([0, 0, 2 * HOUR, 2 * HOUR, 4 * HOUR], 1 * HOUR),
+        ([0, 60, 120], 10 * MINUTE),
+        ([0, 3 * 24 * HOUR], 240 * MINUTE),
+    ],
+)
+def test_compute_interval_median_gap_clamped(published, expected):
+    assert scheduler.compute_interval(published) == expected
+
+
+def test_failures_back_off_exponentially_and_reset_on_success():
+    now = 1_000_000.0
+    intervals = []
+    for _ in range(6):
+        scheduler.record_fetch("feed", success=False, now=now)
+        intervals.append(_schedule("feed")[1])
+
+    assert intervals == [m * MINUTE for m in (10, 20, 40, 80, 160, 240)]
+    assert _schedule("feed")[2] == 6
+
+    scheduler.record_fetch("feed", success=True, now=now)
+    next_due, interval, failures = _schedule("feed")
+    assert (interval, failures) == (10 * MINUTE, 0)
+    assert next_due == now + interval
+
+
+def test_publish_history_keeps_latest_entries():
+    now = 1_000_000.0
+    published = [_iso(now - i * HOUR) for i in range(scheduler.HISTORY_SIZE + 5)]
+    scheduler.record_fetch("feed", published=published, now=now)
+    scheduler.record_fetch("feed", published=published[:3] + ["not a date"], now=now)
+
+    from app.local_store import get_connection
+
+    kept = [
+        row[0]
+        for row in get_connection().execute(
+            "SELECT published FROM feed_publish_times WHERE feed_id = ?", ("feed",)
+        )
+    ]
+    assert len(kept) == scheduler.HISTORY_SIZE
+    assert min(kept) == now - (scheduler.HISTORY_SIZE - 1) * HOUR
+    # 每小时一篇，间隔的一半是 30 分钟
+    assert _schedule("feed")[1] == 30 * MINUTE
+
+
+def test_is_due_with_tolerance():
+    now = 1_000_000.0
+    assert scheduler.is_due("unknown", now=now)
+
+    scheduler.record_fetch("feed", success=True, now=now)
+    next_due = now + 10 * MINUTE
+    tolerance = 5 * MINUTE
+    assert not scheduler.is_due("feed", now=next_due - tolerance - 1)
+    assert scheduler.is_due("feed", now=next_due - tolerance)
@@ -0,0 +1,34 @@
+import pytest
+
+from app.model.article import Article
+from app.sinks import ArticleSink, JsonlSink, SQLiteSink
+
+
+def _articles(n):
+    return [
+        Article(title=f"t{i}", link=f"https://example.com/{i}", content="正文")
+        for i in range(n)
+    ]
+
+
+def test_sink_missing_method_fails_on_creation():
+    class Incomplete(ArticleSink):
+        def filter_existing(self, links):
+            return set()
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.parametrize("make_sink", [SQLiteSink, JsonlSink])
+def test_write_many_and_filter_existing(tmp_path, make_sink):
+    sink = make_sink(str(tmp_path / "articles"))
+    articles = _articles(3)
+
+    assert sink.write_many(articles) == articles
+    # 重复写入不会产生重复记录
+    sink.write_many(articles[:1])
+    assert sink.filter_existing(
+        ["https://example.com/0", "https://example.com/9"]
+    ) == {"https://example.com/0"}
+    sink.close()